@@ -1,27 +1,41 @@
 from flask import Flask, render_template, request, session, redirect, url_for, jsonify
 from flask_socketio import SocketIO
 from google.cloud import firestore
-import os, json, re, threading, traceback
+import os, json, re, functools, threading, time, traceback
 from dotenv import load_dotenv
 from google.cloud import pubsub_v1
 import google.generativeai as genai
 from services.report_service import ReportService
 from services.ai_service import AIService
 from services.user_service import UserService
+from services.password_service import HasherBusyError
+from services.dispatch_queue import DispatchQueue, OPEN_STATUSES
+from services.search_service import IncidentSearchIndex
+from services.leader_service import LeaderElector, PeriodicJob
+from services.lifecycle_service import ArchiveJob
+from services import response_service, session_service, render_service
+from services.upload_service import uploads, UploadRejected, save_upload, IMAGE_TYPES, MB
+from services.response_service import format_timestamp
 from repository.incident_repo import IncidentRepository
 from repository.user_repository import UserRepository
 from datetime import datetime, timedelta
-from werkzeug.utils import secure_filename
-from werkzeug.security import generate_password_hash
 #from services.clustering_service import ClusteringService
 
 load_dotenv()
 app = Flask(__name__)
 app.secret_key = os.getenv("SECRET_KEY", "supersecret")
-socketio = SocketIO(app, cors_allowed_origins="*")
-
+# with more than one worker, emits go through a shared queue (e.g. redis://host:6379/0) to reach every client
+socketio = SocketIO(app, cors_allowed_origins="*", message_queue=os.getenv("SOCKETIO_MESSAGE_QUEUE"),
+                    async_mode=os.getenv("SOCKETIO_ASYNC_MODE"))
+app.json.compact = True
+
+MAX_MEDIA_BYTES = int(os.getenv("MAX_MEDIA_MB", 50)) * MB
+MAX_PROOF_BYTES = int(os.getenv("MAX_PROOF_MB", 10)) * MB
+# backstop for chunked bodies that carry no Content-Length
+app.config["MAX_CONTENT_LENGTH"] = max(MAX_MEDIA_BYTES, MAX_PROOF_BYTES)
 app.config["SESSION_PERMANENT"] = False
 app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(days=30)
+app.session_interface = session_service.create_session_interface()
 
 PROJECT_ID = os.getenv("GCP_PROJECT_ID")
 TOPIC_ID = os.getenv("PUBSUB_TOPIC")
@@ -39,11 +53,57 @@ incident_repo = IncidentRepository()
 user_repo = UserRepository()
 report_service = ReportService()
 user_service = UserService()
+fragment_cache = render_service.FragmentCache()
+dispatch_queue = DispatchQueue(lease_seconds=int(os.getenv("DISPATCH_LEASE_SECONDS", 900)))
+search_index = IncidentSearchIndex()
+ADMIN_REPORT_FIELDS = ["type", "category", "summary", "location", "priority", "status", "media_url", "timestamp", "submitted_by", "version"]
 #clustering_service = ClusteringService(eps=0.3, min_samples=2)
-def format_timestamp(ts):
-    if hasattr(ts, "strftime"):
-        return ts.strftime("%Y-%m-%d %H:%M:%S")
-    return str(ts)
+
+def current_user():
+    ctx = session.get("ctx")
+    if ctx is None and "user" in session:
+        # sessions created before the user context was cached
+        user = user_repo.get_user_by_username(session["user"]) or {"username": session["user"]}
+        ctx = session_service.build_user_context(user)
+        session["ctx"] = ctx
+    return ctx
+
+
+def current_role():
+    ctx = session.get("ctx")
+    # admin sessions always carry a context, so a session without one is a user session
+    return ctx.get("role", "user") if isinstance(ctx, dict) else "user"
+
+
+def require_user(view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if "user" in session and current_role() == "admin":
+            return jsonify({"status": "error", "detail": "Not available to admin accounts"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def require_admin(view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if "user" not in session or current_role() != "admin":
+            if request.method == "GET":
+                return redirect(url_for("admin_login"))
+            return jsonify({"status": "error", "detail": "Admin login required"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def start_user_session(user, role="user"):
+    app.session_interface.regenerate(session)
+    session["user"] = user["username"]
+    session["ctx"] = session_service.build_user_context(user, role=role)
+
+
+@app.after_request
+def compress_response(response):
+    return response_service.compress_response(request, response)
 
 @app.route("/")
 def index():
@@ -58,10 +118,10 @@ def login():
         username = request.form.get("username")
         password = request.form.get("password")
         remember = request.form.get("remember")
-        user, error = user_service.authenticate_user(username, password)
+        user, error = user_service.authenticate_user(username, password, ip=request.remote_addr)
         if error:
             return render_template("login.html", error=error)
-        session["user"] = username
+        start_user_session({"username": username, **user})
         if remember:
             session.permanent = True
             app.permanent_session_lifetime = timedelta(days=30)
@@ -85,12 +145,18 @@ def register():
         errors = user_service.validate_registration(data)
         if errors:
             return render_template("register.html", **data, **errors)
-        user_service.register_user(data)
+        try:
+            errors = user_service.register_user(data)
+        except HasherBusyError:
+            return render_template("register.html", **data, busyError=True), 503
+        if errors:
+            return render_template("register.html", **data, **errors)
         return redirect(url_for("login"))
     return render_template("register.html")
 
 
 @app.route("/dashboard")
+@require_user
 def dashboard():
     if "user" not in session:
         return redirect(url_for("login"))
@@ -100,11 +166,12 @@ def dashboard():
 
 @app.route("/logout")
 def logout():
-    session.pop("user", None)
+    session.clear()
     return redirect(url_for("index"))
 
 
 @app.route("/reports")
+@require_user
 def reports():
     if "user" not in session:
         return redirect(url_for("login"))
@@ -113,6 +180,7 @@ def reports():
 
 
 @app.route("/analytics")
+@require_user
 def analytics():
     if "user" not in session:
         return redirect(url_for("login"))
@@ -120,16 +188,22 @@ def analytics():
 
 
 @app.route("/submit", methods=["GET", "POST"])
+@require_user
+@uploads.guard(MAX_MEDIA_BYTES)
 def submit_report():
     if "user" not in session:
         return jsonify({"status": "error", "detail": "User not logged in"}), 401
     if request.method == "POST":
         try:
-            incident_id = report_service.create_report(request.form, request.files, user=session["user"])
-            report = incident_repo.get_report_by_id(incident_id)
-            if not report:
-                return jsonify({"status": "error", "detail": "Report not found after creation"}), 500
+            incident_id, incident = report_service.create_report(request.form, request.files, user=session["user"])
+            dispatch_queue.enqueue(incident_id, incident.get("priority"), time.time(), incident.get("cluster_id"))
+            search_index.upsert(incident_id, {**incident, "timestamp": datetime.utcnow()})
+            report = {f: incident.get(f) for f in response_service.DEFAULT_LIST_FIELDS}
+            report["id"] = incident_id
+            report["timestamp"] = format_timestamp(datetime.utcnow())
             return jsonify({"status": "success", "incident_id": incident_id, "report": report})
+        except UploadRejected:
+            raise
         except Exception as e:
             traceback.print_exc()
             return jsonify({"status": "error", "detail": str(e)}), 500
@@ -147,15 +221,16 @@ def cluster_incidents():
     return jsonify({"status": "success", "clusters": labels.tolist()})'''
 
 @app.route("/settings")
+@require_user
 def settings():
     if "user" not in session:
         return redirect(url_for("login"))
 
-    user_data = user_repo.get_user_by_username(session["user"])
-    return render_template("settings.html", user_info=user_data, current_page="settings", user=session["user"])
+    return render_template("settings.html", user_info=current_user(), current_page="settings", user=session["user"])
 
 
 @app.route("/update_profile", methods=["POST"])
+@require_user
 def update_profile():
     if "user" not in session:
         return jsonify({"status": "error", "detail": "Not logged in"}), 401
@@ -174,13 +249,18 @@ def update_profile():
                 detail+="\nInvalid Email Address."
         return jsonify({"status": "error", "detail": detail, "errors": errors}), 400
     try:
-        user_service.update_profile(username, data)
+        result = user_service.update_profile(username, data)
+        if result["status"] == "error":
+            detail = "\nEmail already in use." if "mailError" in result["errors"] else "\nUser not found."
+            return jsonify({"status": "error", "detail": detail, "errors": result["errors"]}), 409
+        session["ctx"] = {**current_user(), "name": data["name"], "email": data["email"], "phone": data["phone"]}
         return jsonify({"status": "success"})
     except Exception as e:
         return jsonify({"status": "error", "detail": detail}), 500
 
 
 @app.route("/change_password", methods=["POST"])
+@require_user
 def change_password():
     if "user" not in session:
         return jsonify({"status": "error", "detail": "Not logged in"}), 401
@@ -191,7 +271,12 @@ def change_password():
         data.get("current_password"),
         data.get("new_password"),
         data.get("confirm_password"),
+        ip=request.remote_addr,
     )
+    if errors.get("throttleError"):
+        return jsonify({"status": "error", "detail": "Too many attempts. Please try again later.", "errors": errors}), 429
+    if errors.get("busyError"):
+        return jsonify({"status": "error", "detail": "Server is busy. Please try again.", "errors": errors}), 503
     if errors:
         detail=""
         for i in errors:
@@ -212,65 +297,53 @@ def change_password():
         return jsonify({"status": "error", "detail": detail, "errors": errors}), 400
 
     try:
-        user_service.change_password(username, data["new_password"])
+        # already validated above, so only hash and store
+        user_service.set_password(username, data["new_password"])
+        app.session_interface.store.revoke_user(username, keep=session.sid)
         return jsonify({"status": "success"})
+    except HasherBusyError:
+        return jsonify({"status": "error", "detail": "Server is busy. Please try again."}), 503
     except Exception as e:
         return jsonify({"status": "error", "detail": str(e)}), 500
 
 
 @app.route("/user/reports")
+@require_user
 def get_user_reports():
     if "user" not in session:
         return jsonify({"status": "error", "detail": "Not logged in"}), 401
 
     username = session["user"]
-    reports_stream = incident_repo.get_reports_by_username(username)
-
-    reports = []
-    for doc in reports_stream:
-        r = doc.to_dict()
-        r["timestamp"] = format_timestamp(r.get("timestamp"))
-        r["priority"] = r.get("priority", "Low")
-        r["status"] = r.get("status", "Pending")
-        reports.append(r)
-
-    return jsonify({"status": "success", "reports": reports})
+    fields = response_service.parse_fields(request.args.get("fields"))
+    reports_stream = incident_repo.get_reports_by_username(username, fields=response_service.storage_fields(fields))
+    reports = response_service.serialize_reports(reports_stream, fields)
+    return response_service.encode_payload(request, {"status": "success", "reports": reports})
 
 @app.route('/user/all_reports')
+@require_user
 def get_all_reports():
     if "user" not in session:
         return jsonify({"status": "error", "detail": "Not logged in"})
-    reports_stream = incident_repo.get_all_reports()
-    reports = []
-    for doc in reports_stream:
-        print('doc:', doc)
-        r = doc.to_dict()
-        r["timestamp"] = format_timestamp(r.get("timestamp"))
-        r["priority"] = r.get("priority", "Low")
-        r["status"] = r.get("status", "Pending")
-        reports.append(r)
-    print("Reports:",reports)
-    return jsonify({"status": "success", "reports": reports})
+    fields = response_service.parse_fields(request.args.get("fields"))
+    reports_stream = incident_repo.get_all_reports(fields=response_service.storage_fields(fields))
+    reports = response_service.serialize_reports(reports_stream, fields)
+    return response_service.encode_payload(request, {"status": "success", "reports": reports})
 
 @app.route("/admin/login", methods=["GET", "POST"])
 def admin_login():
     if request.method=='POST':
         username = request.form.get('username')
         password = request.form.get('password')
-        admins = db.collection("admins").where("username", "==", username).get()
-        admin_data = admins[0].to_dict() if admins else None
-        if not admin_data:
-            error='Invalid Username'
-            return render_template("admin_login.html", error=error)
-        if password!=admin_data.get('password'):
-            error='Invalid Password'
+        admin_data, error = user_service.authenticate_admin(username, password, ip=request.remote_addr)
+        if error:
             return render_template("admin_login.html", error=error)
-        session['user']='admin'
+        start_user_session({"username": username, "name": admin_data.get("name")}, role="admin")
         return redirect(url_for("admin_dashboard"))
     return render_template('admin_login.html',error=None)
         
 
 @app.route("/admin/users")
+@require_admin
 def admin_users():
     users_stream = user_repo.get_all_users()
     users = []
@@ -284,12 +357,15 @@ def admin_users():
             "Phone": data.get("phone", "N/A"),
             "Joined": format_timestamp(created_at) if created_at else "—",
         })
-    return render_template("admin_users.html", users=users, current_page="admin_users")
+    etag = render_service.page_etag("admin_users", session.get("user"), [render_service.row_digest(u) for u in users])
+    rows = fragment_cache.render_rows("partials/admin_user_row.html", users, owner_field="Username")
+    return render_service.render_with_etag("admin_users.html", etag, users=users, rows=rows, current_page="admin_users")
 
 
 @app.route("/admin/reports")
+@require_admin
 def admin_reports():
-    reports_stream = incident_repo.get_reports_by_time()
+    reports_stream = incident_repo.get_reports_by_time(fields=ADMIN_REPORT_FIELDS)
     reports = []
     for r in reports_stream:
         data = r.to_dict()
@@ -305,11 +381,15 @@ def admin_reports():
             "media_url": data.get("media_url"),
             "timestamp": format_timestamp(data.get("timestamp")),
             "user_email": data.get("submitted_by", "Unknown"),
+            "version": data.get("version", 0),
         })
-        print(data.get("id"))
-    return render_template("admin_reports.html", reports=reports, page_title="All Reports")
+    # the ETag covers every row, so the whole collection is read before the first byte is sent
+    etag = render_service.page_etag("admin_reports", session.get("user"), [render_service.row_digest(r) for r in reports])
+    rows = fragment_cache.render_rows("partials/admin_report_row.html", reports)
+    return render_service.render_with_etag("admin_reports.html", etag, reports=reports, rows=rows, page_title="All Reports")
 
 @app.route("/admin/reports/<incident_id>")
+@require_admin
 def admin_report_detail(incident_id):
     report = incident_repo.get_report_by_id(incident_id)
     if not report:
@@ -318,6 +398,8 @@ def admin_report_detail(incident_id):
     return render_template("admin_report_detail.html", report=report, current_page="admin_reports", page_title=f"Report #{incident_id}")
 
 @app.route("/admin/reports/<incident_id>/update", methods=["POST"])
+@require_admin
+@uploads.guard(MAX_PROOF_BYTES)
 def update_report_status(incident_id):
     status = request.form.get("status")
     proof = request.files.get("proof")
@@ -326,14 +408,55 @@ def update_report_status(incident_id):
     if status == "Resolved":
         if not proof:
             return jsonify({"status": "error", "detail": "Proof image required for resolution"}), 400
-        filename = secure_filename(proof.filename)
-        proof.save(os.path.join("static/uploads/proofs", filename))
-        proof_url = url_for("static", filename=f"uploads/proofs/{filename}")
+        proof_url = report_service.save_proof(proof)
 
     incident_repo.update_report_status(incident_id, status, proof_url)
+    fragment_cache.invalidate(incident_id)
+    search_index.update_fields(incident_id, status=status)
+    if status not in OPEN_STATUSES:
+        dispatch_queue.remove(incident_id)
     return redirect(url_for("admin_reports"))
 
+@app.route("/admin/reports/bulk_update", methods=["POST"])
+@require_admin
+@uploads.guard(MAX_PROOF_BYTES)
+def bulk_update_report_status():
+    status = request.form.get("status")
+    incident_ids = [i for i in request.form.getlist("incident_ids") if i]
+    if not status or not incident_ids:
+        return jsonify({"status": "error", "detail": "Status and at least one incident are required"}), 400
+
+    shared_proof = request.files.get("proof")
+    proofs = {}
+    for incident_id in incident_ids:
+        proof = request.files.get(f"proof_{incident_id}") or shared_proof
+        if proof:
+            proofs[incident_id] = proof
+    if status == "Resolved" and len(proofs) < len(incident_ids):
+        return jsonify({"status": "error", "detail": "Proof image required for resolution"}), 400
+    versions = {}
+    for incident_id in incident_ids:
+        version = request.form.get(f"version_{incident_id}")
+        if version in (None, ""):
+            continue
+        try:
+            versions[incident_id] = int(version)
+        except ValueError:
+            return jsonify({"status": "error", "detail": f"Invalid version for incident {incident_id}"}), 400
+
+    result = report_service.bulk_update_status(incident_ids, status, proofs, versions)
+    for incident_id in result["updated"]:
+        fragment_cache.invalidate(incident_id)
+        search_index.update_fields(incident_id, status=status)
+        if status not in OPEN_STATUSES:
+            dispatch_queue.remove(incident_id)
+    result.pop("previous_status", None)
+    code = 409 if result["conflicts"] and not result["updated"] else 200
+    return jsonify({"status": "success" if result["updated"] else "error", **result}), code
+
 @app.route("/admin/reports/<incident_id>/proof", methods=["POST"])
+@require_admin
+@uploads.guard(MAX_PROOF_BYTES)
 def upload_proof(incident_id):
     file = request.files.get("proof_image")
     notes = request.form.get("notes", "")
@@ -341,10 +464,7 @@ def upload_proof(incident_id):
     if not file:
         return "No file uploaded", 400
 
-    filename = secure_filename(file.filename)
-    path = os.path.join("static/proofs", filename)
-    file.save(path)
-    image_url = url_for('static', filename=f"proofs/{filename}")
+    image_url = save_upload(file, "static/proofs", IMAGE_TYPES, "proofs")
 
     '''db.collection("proofs").add({
         "incident_id": incident_id,
@@ -355,13 +475,23 @@ def upload_proof(incident_id):
     })'''
 
     incident_repo.update_report_status(incident_id, "Resolved", proof_url=image_url)
+    fragment_cache.invalidate(incident_id)
+    search_index.update_fields(incident_id, status="Resolved")
+    dispatch_queue.remove(incident_id)
 
     return redirect(url_for('admin_report_detail', incident_id=incident_id))
 
 
+@app.route("/admin/uploads/metrics")
+@require_admin
+def upload_metrics():
+    return jsonify(uploads.snapshot())
+
+
 @app.route("/admin/dashboard")
+@require_admin
 def admin_dashboard():
-    reports_stream = incident_repo.get_reports_by_time()
+    reports_stream = incident_repo.get_reports_by_time(fields=["status"])
     reports = [r.to_dict() for r in reports_stream]
     stats = {
         "total_reports": len(reports),
@@ -369,37 +499,166 @@ def admin_dashboard():
         "resolved": len([r for r in reports if r.get("status") == "Resolved"]),
         "active_users": (user_repo.get_users_count())
     }
-    print("Stats:", stats)
     recent_reports_stream = incident_repo.get_recent_high_priority_reports(limit=5)
     recent_reports = []
     for doc in recent_reports_stream:
         data = doc.to_dict()
-        data["id"] = doc.id 
-        data["timestamp"] = format_timestamp(data.get("timestamp"))
-        recent_reports.append(data)
-    print("Recent Reports:",recent_reports)
-    return render_template("admin_dashboard.html", stats=stats, recent_reports=recent_reports, current_page="admin_dashboard")
+        recent_reports.append({
+            "id": doc.id,
+            "type": data.get("type"),
+            "status": data.get("status"),
+            "location": data.get("location"),
+            "timestamp": format_timestamp(data.get("timestamp")),
+        })
+    etag = render_service.page_etag("admin_dashboard", session.get("user"), stats, [render_service.row_digest(r) for r in recent_reports])
+    recent_rows = fragment_cache.render_rows("partials/admin_recent_report_row.html", recent_reports)
+    return render_service.render_with_etag("admin_dashboard.html", etag, stream=False, stats=stats, recent_rows=recent_rows, current_page="admin_dashboard")
+
+
+
+@app.route("/admin/search")
+@require_admin
+def admin_search():
+    try:
+        date_from = datetime.fromisoformat(request.args["from"]) if request.args.get("from") else None
+        date_to = datetime.fromisoformat(request.args["to"]) + timedelta(days=1) if request.args.get("to") else None
+        result = search_index.search(
+            request.args.get("q", ""),
+            filters={field: request.args.get(field) for field in ("type", "category", "status", "priority")},
+            date_from=date_from,
+            date_to=date_to,
+            page=int(request.args.get("page", 1)),
+            per_page=int(request.args.get("per_page", 20)),
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "detail": str(e)}), 400
+    return jsonify({"status": "success", **result})
+
+@app.route("/admin/dispatch")
+@require_admin
+def dispatch_overview():
+    return jsonify({"status": "success", "next": dispatch_queue.peek(int(request.args.get("limit", 10))), **dispatch_queue.stats()})
+
+@app.route("/admin/dispatch/claim", methods=["POST"])
+@require_admin
+def dispatch_claim():
+    admin = session.get("user", "admin")
+    item = dispatch_queue.claim(admin)
+    while item and not incident_repo.set_dispatch_claim(item["id"], admin, item["lease_expires_at"]):
+        # claimed through another worker since our last refresh
+        dispatch_queue.remove(item["id"])
+        item = dispatch_queue.claim(admin)
+    if not item:
+        return jsonify({"status": "empty"}), 404
+    return jsonify({"status": "success", "incident": item})
+
+@app.route("/admin/dispatch/<incident_id>/complete", methods=["POST"])
+@require_admin
+def dispatch_complete(incident_id):
+    if not dispatch_queue.complete(incident_id, admin=session.get("user", "admin")):
+        return jsonify({"status": "error", "detail": "Incident is not claimed by you"}), 409
+    incident_repo.clear_dispatch_claim(incident_id)
+    return jsonify({"status": "success"})
+
+@app.route("/admin/dispatch/<incident_id>/release", methods=["POST"])
+@require_admin
+def dispatch_release(incident_id):
+    if not dispatch_queue.release(incident_id, admin=session.get("user", "admin")):
+        return jsonify({"status": "error", "detail": "Incident is not claimed by you"}), 409
+    incident_repo.clear_dispatch_claim(incident_id)
+    return jsonify({"status": "success"})
+
+
+def update_dispatch_queue(event, data):
+    if event == "new_incident" and data.get("incident_id"):
+        dispatch_queue.enqueue(data["incident_id"], data.get("priority", "Low"), data.get("timestamp"), data.get("cluster_id"))
+        search_index.upsert(data["incident_id"], data)
+    elif event == "incidents_updated":
+        for incident_id in data.get("incident_ids", []):
+            search_index.update_fields(incident_id, status=data.get("status"))
+            if data.get("status") not in OPEN_STATUSES:
+                dispatch_queue.remove(incident_id)
+
+
+def recover_dispatch_queue():
+    global dispatch_queue
+    try:
+        queue = DispatchQueue(lease_seconds=dispatch_queue.lease_seconds)
+        count = queue.load(incident_repo.get_open_reports(
+            OPEN_STATUSES, fields=["priority", "timestamp", "cluster_id", "claimed_by", "lease_expires_at"]))
+        dispatch_queue = queue
+        print("Dispatch queue recovered:", count)
+    except Exception as e:
+        print("Dispatch queue recovery failed:", e)
 
 
+def refresh_dispatch_queue(interval):
+    # followers miss the Pub/Sub events the leader consumes, so they reload open incidents instead
+    while True:
+        recover_dispatch_queue()
+        time.sleep(interval)
+        while leader.is_leader:
+            time.sleep(interval)
+
 
 def callback(message):
     try:
         data = json.loads(message.data.decode("utf-8"))
-        socketio.emit("new_incident", data)
+        event = data.get("event", "new_incident")
+        update_dispatch_queue(event, data)
+        socketio.emit(event, data)
         message.ack()
     except Exception as e:
         print("Subscriber error:", e)
 
 
+subscriber_future = None
+subscriber_lock = threading.Lock()
+
 def start_subscriber():
-    future = subscriber.subscribe(subscription_path, callback=callback)
+    global subscriber_future
+    subscriber_future = subscriber.subscribe(subscription_path, callback=callback)
+    threading.Thread(target=wait_subscriber, args=(subscriber_future,), daemon=True).start()
+
+
+def wait_subscriber(future):
     try:
         future.result()
     except Exception:
         future.cancel()
 
 
-threading.Thread(target=start_subscriber, daemon=True).start()
+def stop_subscriber():
+    global subscriber_future
+    with subscriber_lock:
+        if subscriber_future is not None:
+            subscriber_future.cancel()
+            subscriber_future = None
+
+
+def take_over():
+    # catch up on anything applied by the previous leader before consuming events
+    recover_dispatch_queue()
+    with subscriber_lock:
+        # leadership may have been lost, or regained by another take_over, during the scan
+        if leader.is_leader and subscriber_future is None:
+            start_subscriber()
+
+
+def on_elected():
+    # the open-incident scan can outlast the lease TTL, so it must not block renewal
+    threading.Thread(target=take_over, daemon=True).start()
+
+
+# the leader alone consumes Pub/Sub and emits through the message queue, so each event reaches each client once
+leader = LeaderElector("background-jobs", on_elected=on_elected, on_demoted=stop_subscriber)
+ARCHIVE_INTERVAL_SECONDS = int(os.getenv("ARCHIVE_INTERVAL_SECONDS", 0))
+
+if os.getenv("BACKGROUND_JOBS", "1") == "1":
+    leader.start()
+    if ARCHIVE_INTERVAL_SECONDS:
+        PeriodicJob("Archive job", lambda: ArchiveJob().run(), ARCHIVE_INTERVAL_SECONDS, leader).start()
+    threading.Thread(target=refresh_dispatch_queue, args=(int(os.getenv("DISPATCH_REFRESH_SECONDS", 30)),), daemon=True).start()
 
 if __name__ == "__main__":
     socketio.run(app, debug=True)
@@ -0,0 +1,47 @@
+"""Render time of the admin reports page vs. row count.
+
+Compares a cold fragment cache, a warm fragment cache, and time to the first
+streamed chunk. Runs against the real templates with stub routes, so no
+Firestore access is needed.
+
+Usage: python -m benchmarks.bench_admin_render [--rows 100 1000 10000]
+"""
+import argparse
+import time
+from services import render_service
+from tests.test_render_service import make_app, make_reports
+
+
+def render(cache, reports, stream):
+    start = time.perf_counter()
+    rows = cache.render_rows("partials/admin_report_row.html", reports)
+    etag = render_service.page_etag("admin_reports", "bench", [render_service.row_digest(r) for r in reports])
+    response = render_service.render_with_etag("admin_reports.html", etag, stream=stream, reports=reports, rows=rows, page_title="All Reports")
+    chunks = iter(response.response)
+    next(chunks)
+    first = time.perf_counter() - start
+    for _ in chunks:
+        pass
+    return first, time.perf_counter() - start
+
+
+def run(app, n):
+    reports = make_reports(n)
+    cache = render_service.FragmentCache(max_entries=max(n, 1))
+    with app.test_request_context("/admin/reports"):
+        setup = time.perf_counter()
+        _, cold = render(cache, reports, stream=False)
+        _, warm = render(cache, reports, stream=False)
+        first, streamed = render(cache, reports, stream=True)
+        total = time.perf_counter() - setup
+    print(f"rows={n:<7} cold={cold * 1000:9.1f}ms warm={warm * 1000:9.1f}ms "
+          f"stream_first_chunk={first * 1000:7.2f}ms stream_total={streamed * 1000:9.1f}ms ({total:.1f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+    app = make_app()
+    for n in args.rows:
+        run(app, n)
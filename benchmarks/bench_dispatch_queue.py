@@ -0,0 +1,39 @@
+"""Enqueue/claim/complete throughput of DispatchQueue at 100k open incidents.
+
+Usage: python -m benchmarks.bench_dispatch_queue [--items 100000]
+"""
+import argparse
+import random
+import time
+from services.dispatch_queue import DispatchQueue
+
+
+def timed(label, n, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {n:>8} ops {elapsed * 1000:9.1f}ms {elapsed / n * 1e6:7.2f}us/op")
+
+
+def main(items):
+    rng = random.Random(7)
+    queue = DispatchQueue()
+    now = time.time()
+    incidents = [
+        (f"incident{i}", rng.choice(["High", "Medium", "Low"]), now - rng.uniform(0, 86400), rng.randrange(items // 10))
+        for i in range(items)
+    ]
+    timed("enqueue", items, lambda: [queue.enqueue(*incident) for incident in incidents])
+    updates = rng.sample(incidents, items // 10)
+    timed("re-prioritise", len(updates), lambda: [queue.enqueue(i, "High", ts, c) for i, _, ts, c in updates])
+    claimed = []
+    timed("claim", items // 2, lambda: claimed.extend(queue.claim(f"admin{i % 20}") for i in range(items // 2)))
+    timed("complete", len(claimed), lambda: [queue.complete(c["id"], c["claimed_by"]) for c in claimed])
+    timed("peek(10)", 100, lambda: [queue.peek(10) for _ in range(100)])
+    print("remaining", queue.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100_000)
+    main(parser.parse_args().items)
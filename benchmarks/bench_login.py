@@ -0,0 +1,34 @@
+"""Measure password-verification throughput (logins/second per core).
+
+Usage: python -m benchmarks.bench_login [--method scrypt:32768:8:1] [--seconds 5]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from services.password_service import PasswordHasher
+
+
+def run(method, workers, seconds):
+    hasher = PasswordHasher(method=method, max_workers=workers, max_pending=workers * 4, wait_timeout=60)
+    stored = hasher.hash("Correct#Horse9")
+    done = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers * 2) as clients:
+        while time.perf_counter() < deadline:
+            batch = [clients.submit(hasher.verify, stored, "Correct#Horse9") for _ in range(workers * 2)]
+            done += sum(1 for f in batch if f.result())
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed
+    print(f"{method:<24} workers={workers:<3} logins/s={rate:8.1f} per-core={rate / workers:8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--method", action="append")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+    for method in args.method or ["scrypt:32768:8:1", "pbkdf2:sha256:600000", "pbkdf2:sha256:100000"]:
+        run(method, args.workers, args.seconds)
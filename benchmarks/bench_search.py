@@ -0,0 +1,89 @@
+"""Query latency of the incident search index at a few hundred thousand incidents.
+
+Usage: python -m benchmarks.bench_search [--items 300000] [--path /tmp/bench_search.sqlite3]
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from services.search_service import IncidentSearchIndex
+
+WORDS = ("bus car bike truck collision fire smoke garbage overflow pothole streetlight flicker theft chain "
+         "snatching water leak pipe burst traffic jam signal failure tree fallen drain blocked flooding "
+         "accident injury ambulance noise construction dog stray parking footpath market school hospital").split()
+LOCATIONS = ["Tambaram", "Guindy", "Adyar", "T Nagar", "Velachery", "Anna Nagar", "Porur", "Central Park"]
+QUERIES = [
+    ("word", "garbage", {}),
+    ("prefix", "flood*", {}),
+    ("phrase", '"signal failure"', {}),
+    ("column", "location:tambaram", {}),
+    ("word+filter", "fire", {"status": "Pending", "priority": "High"}),
+    ("filter only", "", {"type": "Traffic"}),
+    ("multi-word", "bus collision injury", {}),
+]
+
+
+def make_vocabulary(rng, size=5000):
+    # Zipf-like vocabulary: the domain words are the most frequent, the tail is rare
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    tail = ["".join(rng.choices(letters, k=rng.randint(4, 9))) for _ in range(size - len(WORDS))]
+    vocabulary = WORDS + tail
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    return vocabulary, weights
+
+
+def make_incidents(n, rng):
+    start = datetime(2024, 1, 1)
+    vocabulary, weights = make_vocabulary(rng)
+    for i in range(n):
+        yield f"incident{i:07d}", {
+            "description": " ".join(rng.choices(vocabulary, weights, k=rng.randint(12, 40))),
+            "summary": " ".join(rng.choices(vocabulary, weights, k=8)),
+            "location": rng.choice(LOCATIONS),
+            "type": rng.choice(["Accident", "Fire", "Theft", "Medical", "Traffic", "Other"]),
+            "status": rng.choice(["Pending", "In Progress", "Resolved"]),
+            "priority": rng.choice(["Low", "Medium", "High"]),
+            "timestamp": start + timedelta(minutes=i),
+        }
+
+
+def main(items, path):
+    if os.path.exists(path):
+        os.remove(path)
+    rng = random.Random(11)
+    index = IncidentSearchIndex(path)
+    start = time.perf_counter()
+    batch = []
+    for record in make_incidents(items, rng):
+        batch.append(record)
+        if len(batch) == 1000:
+            index.upsert_many(batch)
+            batch = []
+    index.upsert_many(batch)
+    print(f"indexed {items} incidents in {time.perf_counter() - start:.1f}s")
+
+    for label, query, filters in QUERIES:
+        for page in (1, 50):
+            timings = []
+            for _ in range(20):
+                t = time.perf_counter()
+                result = index.search(query, filters=filters, page=page)
+                timings.append((time.perf_counter() - t) * 1000)
+            print(f"{label:<12} page={page:<3} total={result['total']:<7} "
+                  f"p50={statistics.median(timings):7.2f}ms max={max(timings):7.2f}ms")
+
+    t = time.perf_counter()
+    for i in range(1000):
+        index.update_fields(f"incident{i:07d}", status="Resolved")
+    print(f"status update avg={(time.perf_counter() - t):.3f}ms")
+    index.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=300_000)
+    parser.add_argument("--path", default="/tmp/bench_search.sqlite3")
+    args = parser.parse_args()
+    main(args.items, args.path)
@@ -0,0 +1,119 @@
+"""Offline replay/evaluation of the AI agents against recorded Gemini responses.
+
+Re-runs AIService.classify_incident over a corpus of stored incidents, serving
+model responses from fixtures (prompt hash -> response), and reports accuracy
+against the recorded labels, calls and tokens per report, and throughput.
+
+Corpus is JSONL, one incident per line:
+    {"id": "...", "description": "...", "type": "Traffic", "priority": "Medium"}
+
+Usage:
+    python -m benchmarks.replay_ai_agents --corpus incidents.jsonl --workers 16 --latency lognormal:900,0.35
+    python -m benchmarks.replay_ai_agents --corpus incidents.jsonl --mode record   # live calls, writes fixtures
+    python -m benchmarks.replay_ai_agents --export-corpus incidents.jsonl          # dump incidents from Firestore
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from services.ai_service import AIService
+from services.ai_replay import FixtureStore, LatencyModel, MissingFixtureError
+
+
+def normalize_label(value):
+    return (value or "").strip().strip('"').strip().lower()
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def export_corpus(path):
+    from repository.incident_repo import IncidentRepository
+    docs = IncidentRepository().get_all_reports(fields=["description", "type", "priority", "summary"])
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for doc in docs:
+            data = doc.to_dict()
+            if data.get("description"):
+                f.write(json.dumps({"id": doc.id, **data}) + "\n")
+                count += 1
+    return count
+
+
+def evaluate_one(incident, mode, fixtures, latency_model):
+    service = AIService(replay_mode=mode, fixtures=fixtures, latency_model=latency_model)
+    start = time.perf_counter()
+    try:
+        result = service.classify_incident(incident["description"])
+        error = None
+    except MissingFixtureError as e:
+        result, error = {}, str(e)
+    return {
+        "id": incident.get("id"),
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+        "category_ok": normalize_label(result.get("category")) == normalize_label(incident.get("type")),
+        "priority_ok": normalize_label(result.get("priority")) == normalize_label(incident.get("priority")),
+        "error": error,
+        **service.stats.as_dict(),
+    }
+
+
+def run(corpus, mode="replay", fixture_dir="tests/fixtures/ai", workers=8, latency="recorded", seed=0):
+    fixtures = FixtureStore(fixture_dir)
+    latency_model = LatencyModel(latency, seed=seed)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda incident: evaluate_one(incident, mode, fixtures, latency_model), corpus))
+    wall = time.perf_counter() - start
+    return summarize(results, wall, workers, latency)
+
+
+def summarize(results, wall, workers, latency):
+    scored = [r for r in results if not r["error"]]
+    n = len(scored) or 1
+    elapsed = sorted(r["elapsed_ms"] for r in scored) or [0.0]
+    return {
+        "reports": len(results),
+        "missing_fixtures": len(results) - len(scored),
+        "workers": workers,
+        "latency_model": latency,
+        "category_accuracy": round(sum(r["category_ok"] for r in scored) / n, 4),
+        "priority_accuracy": round(sum(r["priority_ok"] for r in scored) / n, 4),
+        "calls_per_report": round(sum(r["calls"] for r in scored) / n, 2),
+        "prompt_tokens_per_report": round(sum(r["prompt_tokens"] for r in scored) / n, 1),
+        "output_tokens_per_report": round(sum(r["output_tokens"] for r in scored) / n, 1),
+        "p50_report_ms": round(statistics.median(elapsed), 1),
+        "p95_report_ms": round(elapsed[min(len(elapsed) - 1, int(len(elapsed) * 0.95))], 1),
+        "wall_seconds": round(wall, 3),
+        "reports_per_second": round(len(scored) / wall, 2) if wall else None,
+        "errors": [r["error"] for r in results if r["error"]][:10],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus")
+    parser.add_argument("--export-corpus")
+    parser.add_argument("--mode", choices=["replay", "record"], default="replay")
+    parser.add_argument("--fixtures", default=os.getenv("AI_FIXTURE_DIR", "tests/fixtures/ai"))
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", default="recorded")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    if args.export_corpus:
+        print("Exported", export_corpus(args.export_corpus), "incidents")
+    else:
+        report = run(load_corpus(args.corpus), args.mode, args.fixtures, args.workers, args.latency, args.seed)
+        text = json.dumps(report, indent=2)
+        print(text)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text)
+        if report["missing_fixtures"] and args.mode == "replay":
+            raise SystemExit(1)
@@ -0,0 +1,16 @@
+from google.cloud import firestore
+
+db = firestore.Client()
+
+class AdminRepository:
+    def __init__(self):
+        self.collection = db.collection("admins")
+
+    def get_admin_by_username(self, username):
+        docs = self.collection.where("username", "==", username).limit(1).get()
+        if not docs:
+            return None
+        return {"doc_id": docs[0].id, **docs[0].to_dict()}
+
+    def update_admin(self, doc_id, data):
+        self.collection.document(doc_id).update(data)
@@ -0,0 +1,108 @@
+import glob
+import gzip
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+from google.cloud import firestore
+
+db = firestore.Client()
+
+
+def _json_default(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class FirestoreArchiveSink:
+    name = "firestore"
+
+    def __init__(self):
+        self.collection = db.collection("incidents_archive")
+
+    def write(self, batch, records):
+        # written through the caller's batch so archive, tombstone and delete commit together
+        for incident_id, data in records:
+            batch.set(self.collection.document(incident_id), data)
+        return {incident_id: self.name for incident_id, _ in records}
+
+    def read(self, incident_id, location):
+        doc = self.collection.document(incident_id).get()
+        return doc.to_dict() if doc.exists else None
+
+
+class NdjsonArchiveSink:
+    name = "ndjson"
+
+    def __init__(self, root=None):
+        self.root = root or os.getenv("ARCHIVE_DIR", "archive/incidents")
+
+    def write(self, batch, records):
+        os.makedirs(self.root, exist_ok=True)
+        segment = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.ndjson.gz"
+        path = os.path.join(self.root, segment)
+        tmp = f"{path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            for incident_id, data in records:
+                f.write(json.dumps({"id": incident_id, **data}, default=_json_default) + "\n")
+        os.replace(tmp, path)
+        return {incident_id: f"ndjson:{segment}" for incident_id, _ in records}
+
+    def read(self, incident_id, location):
+        segment = location.split(":", 1)[1]
+        path = os.path.join(self.root, segment)
+        if not os.path.exists(path):
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if record.get("id") == incident_id:
+                    record.pop("id")
+                    return record
+        return None
+
+    def segments(self):
+        return sorted(glob.glob(os.path.join(self.root, "*.ndjson.gz")))
+
+
+class ArchiveRepository:
+    def __init__(self, sinks=None):
+        self.tombstones = db.collection("archived_incidents")
+        self.checkpoints = db.collection("lifecycle")
+        sinks = sinks or [FirestoreArchiveSink(), NdjsonArchiveSink()]
+        self.sinks = {sink.name: sink for sink in sinks}
+
+    def get_archived_report(self, incident_id):
+        tombstone = self.tombstones.document(incident_id).get()
+        if not tombstone.exists:
+            return None
+        location = tombstone.to_dict().get("location", "firestore")
+        sink = self.sinks.get(location.split(":", 1)[0])
+        if sink is None:
+            return None
+        data = sink.read(incident_id, location)
+        if data is None:
+            return None
+        return {"id": incident_id, **data, "archived": True}
+
+    def archive(self, sink, records, source_collection):
+        batch = db.batch()
+        locations = sink.write(batch, records)
+        for incident_id, data in records:
+            batch.set(self.tombstones.document(incident_id), {
+                "location": locations[incident_id],
+                "status": data.get("status"),
+                "resolved_at": data.get("resolved_at") or data.get("timestamp"),
+                "archived_at": firestore.SERVER_TIMESTAMP,
+            })
+            batch.delete(source_collection.document(incident_id))
+        batch.commit()
+        return len(records)
+
+    def get_checkpoint(self, job_name):
+        doc = self.checkpoints.document(job_name).get()
+        return doc.to_dict() if doc.exists else {}
+
+    def save_checkpoint(self, job_name, checkpoint):
+        self.checkpoints.document(job_name).set(checkpoint)
@@ -1,10 +1,20 @@
+import time
 from google.cloud import firestore
+from repository.archive_repository import ArchiveRepository
 
 db = firestore.Client()
+# Firestore caps a transaction at 500 writes
+BATCH_LIMIT = 500
+
+def resolution_fields(status):
+    if status == "Resolved":
+        return {"resolved_at": firestore.SERVER_TIMESTAMP}
+    return {"resolved_at": firestore.DELETE_FIELD}
 
 class IncidentRepository:
     def __init__(self):
         self.collection = db.collection("incidents")
+        self.archive = ArchiveRepository()
 
     def save(self, incident_data):
         doc_ref = self.collection.document()
@@ -15,16 +25,62 @@ class IncidentRepository:
         doc = doc_ref.get()
         if doc.exists:
             return {"id": doc.id, **doc.to_dict()}
-        return None
+        return self.archive.get_archived_report(incident_id)
 
     def update_report_status(self, incident_id, status, proof_url=None):
-        update_data = {"status": status}
+        update_data = {"status": status, "version": firestore.Increment(1), **resolution_fields(status)}
         if proof_url:
             update_data["proof_image"] = proof_url
         self.collection.document(incident_id).update(update_data)
 
-    def get_all_reports(self):
-        docs = self.collection.stream()
+    def bulk_update_status(self, incident_ids, status, proof_urls=None, expected_versions=None):
+        proof_urls = proof_urls or {}
+        expected_versions = expected_versions or {}
+        result = {"updated": [], "conflicts": [], "missing": [], "previous_status": {}}
+        ids = list(dict.fromkeys(incident_ids))
+        for start in range(0, len(ids), BATCH_LIMIT):
+            chunk = ids[start:start + BATCH_LIMIT]
+            chunk_result = self._update_status_chunk(db.transaction(), chunk, status, proof_urls, expected_versions)
+            for key in ("updated", "conflicts", "missing"):
+                result[key].extend(chunk_result[key])
+            result["previous_status"].update(chunk_result["previous_status"])
+        return result
+
+    def _update_status_chunk(self, transaction, incident_ids, status, proof_urls, expected_versions):
+        refs = [self.collection.document(incident_id) for incident_id in incident_ids]
+
+        @firestore.transactional
+        def apply(transaction):
+            result = {"updated": [], "conflicts": [], "missing": [], "previous_status": {}}
+            snapshots = {snap.id: snap for snap in transaction.get_all(refs)}
+            for ref in refs:
+                snap = snapshots.get(ref.id)
+                if snap is None or not snap.exists:
+                    result["missing"].append(ref.id)
+                    continue
+                data = snap.to_dict()
+                version = data.get("version", 0)
+                expected = expected_versions.get(ref.id)
+                if expected is not None and int(expected) != version:
+                    result["conflicts"].append({"id": ref.id, "version": version})
+                    continue
+                update_data = {"status": status, "version": version + 1, **resolution_fields(status)}
+                if proof_urls.get(ref.id):
+                    update_data["proof_image"] = proof_urls[ref.id]
+                transaction.update(ref, update_data)
+                result["updated"].append(ref.id)
+                result["previous_status"][ref.id] = data.get("status", "Pending")
+            return result
+
+        return apply(transaction)
+
+    def _project(self, query, fields):
+        if fields:
+            return query.select(list(fields))
+        return query
+
+    def get_all_reports(self, fields=None):
+        docs = self._project(self.collection, fields).stream()
         return docs
     
     def get_recent_high_priority_reports(self, limit=5):
@@ -32,12 +88,47 @@ class IncidentRepository:
         docs = query.stream()
         return docs
     
-    def get_reports_by_time(self):
+    def get_reports_by_time(self, fields=None):
         query = self.collection.order_by("timestamp", direction=firestore.Query.DESCENDING)
-        docs = query.stream()
+        docs = self._project(query, fields).stream()
         return docs
     
-    def get_reports_by_username(self, username):
+    def get_open_reports(self, statuses, fields=None):
+        query = self.collection.where("status", "in", list(statuses))
+        docs = self._project(query, fields).stream()
+        return docs
+
+    def set_dispatch_claim(self, incident_id, admin, lease_expires_at, now=None):
+        # workers keep their own queues, so the document decides who holds the claim
+        ref = self.collection.document(incident_id)
+
+        @firestore.transactional
+        def claim(transaction):
+            snap = ref.get(transaction=transaction)
+            if not snap.exists:
+                return False
+            data = snap.to_dict()
+            holder = data.get("claimed_by")
+            if holder not in (None, admin) and (data.get("lease_expires_at") or 0) > (now or time.time()):
+                return False
+            transaction.update(ref, {"claimed_by": admin, "lease_expires_at": lease_expires_at})
+            return True
+
+        return claim(db.transaction())
+
+    def clear_dispatch_claim(self, incident_id):
+        self.collection.document(incident_id).update({"claimed_by": None, "lease_expires_at": None})
+
+    def get_archive_candidates(self, cutoff, after_timestamp=None, limit=100):
+        # resolved_at >= timestamp, so submitted-before-cutoff is a superset of resolved-before-cutoff
+        query = (self.collection.where("status", "==", "Resolved")
+                 .where("timestamp", "<", cutoff)
+                 .order_by("timestamp"))
+        if after_timestamp is not None:
+            query = query.start_after({"timestamp": after_timestamp})
+        return list(query.limit(limit).stream())
+
+    def get_reports_by_username(self, username, fields=None):
         query = self.collection.where("submitted_by", "==", username).order_by("timestamp", direction=firestore.Query.DESCENDING)
-        docs = query.stream()
-        return docs
\ No newline at end of file
+        docs = self._project(query, fields).stream()
+        return docs
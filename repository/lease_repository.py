@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+from google.cloud import firestore
+
+db = firestore.Client()
+
+class LeaseRepository:
+    def __init__(self):
+        self.collection = db.collection("leases")
+
+    def try_acquire(self, name, holder, ttl_seconds):
+        """Takes or renews the lease if it is free, expired or already ours. Returns the expiry on success."""
+        doc_ref = self.collection.document(name)
+        transaction = db.transaction()
+
+        @firestore.transactional
+        def acquire(transaction):
+            now = datetime.now(timezone.utc)
+            snapshot = doc_ref.get(transaction=transaction)
+            lease = snapshot.to_dict() if snapshot.exists else {}
+            if lease.get("holder") not in (None, holder) and lease.get("expires_at") and lease["expires_at"] > now:
+                return None
+            expires_at = now + timedelta(seconds=ttl_seconds)
+            transaction.set(doc_ref, {
+                "holder": holder,
+                "expires_at": expires_at,
+                "term": lease.get("term", 0) + (0 if lease.get("holder") == holder else 1),
+                "renewed_at": now,
+            })
+            return expires_at
+
+        return acquire(transaction)
+
+    def release(self, name, holder):
+        doc_ref = self.collection.document(name)
+        transaction = db.transaction()
+
+        @firestore.transactional
+        def release(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            if snapshot.exists and snapshot.to_dict().get("holder") == holder:
+                transaction.update(doc_ref, {"holder": None, "expires_at": None})
+                return True
+            return False
+
+        return release(transaction)
+
+    def get_lease(self, name):
+        doc = self.collection.document(name).get()
+        return doc.to_dict() if doc.exists else None
@@ -1,33 +1,113 @@
 from google.cloud import firestore
+from google.api_core.exceptions import NotFound, AlreadyExists
+from urllib.parse import quote
 
 db = firestore.Client()
 
+def email_key(email):
+    return quote((email or "").strip().lower(), safe="@.+-_")
+
 class UserRepository:
     def __init__(self):
         self.collection = db.collection("users")
+        self.emails = db.collection("emails")
 
     def get_user_by_username(self, username):
         doc = self.collection.document(username).get()
         return doc.to_dict() if doc.exists else None
 
     def get_user_by_email(self, email):
-        docs = self.collection.where("email", "==", email).get()
+        reservation = self.emails.document(email_key(email)).get()
+        if reservation.exists:
+            return self.get_user_by_username(reservation.to_dict()["username"])
+        # users created before email reservations existed
+        docs = self.collection.where("email", "==", email).limit(1).get()
         return docs[0].to_dict() if docs else None
 
+    def _legacy_email_taken(self, email, transaction=None, exclude=None):
+        # users created before email reservations existed, until backfill_email_reservations has run
+        query = self.collection.where("email", "==", email).limit(2)
+        docs = list(query.get(transaction=transaction)) if transaction else query.get()
+        return any(doc.id != exclude for doc in docs)
+
+    def get_email_owner(self, email):
+        reservation = self.emails.document(email_key(email)).get()
+        if reservation.exists:
+            return reservation.to_dict()["username"]
+        user = self.get_user_by_email(email)
+        return user["username"] if user else None
+
     def save_user(self, user_dict):
-        self.collection.document(user_dict["username"]).set(user_dict)
+        user_ref = self.collection.document(user_dict["username"])
+        email_ref = self.emails.document(email_key(user_dict["email"]))
+
+        @firestore.transactional
+        def create(transaction):
+            snapshots = {snap.reference.path: snap for snap in transaction.get_all([user_ref, email_ref])}
+            errors = {}
+            if snapshots[user_ref.path].exists:
+                errors["userError"] = True
+            if snapshots[email_ref.path].exists or self._legacy_email_taken(user_dict["email"], transaction):
+                errors["mailError"] = True
+            if errors:
+                return errors
+            transaction.create(user_ref, user_dict)
+            transaction.create(email_ref, {"username": user_dict["username"]})
+            return {}
+
+        return create(db.transaction())
 
     def update_user(self, username, data):
-        docs = self.collection.where("username", "==", username).get()
-        if not docs:
-            return None
-        doc_ref = docs[0].reference
-        doc_ref.update(data)
+        user_ref = self.collection.document(username)
+        if "email" not in data:
+            try:
+                user_ref.update(data)
+            except NotFound:
+                return None
+            return True
+
+        new_email_ref = self.emails.document(email_key(data["email"]))
+
+        @firestore.transactional
+        def update(transaction):
+            snapshots = {snap.reference.path: snap for snap in transaction.get_all([user_ref, new_email_ref])}
+            user_snap = snapshots[user_ref.path]
+            if not user_snap.exists:
+                return None
+            reservation = snapshots[new_email_ref.path]
+            if reservation.exists and reservation.to_dict().get("username") != username:
+                return {"mailError": True}
+            if not reservation.exists and self._legacy_email_taken(data["email"], transaction, exclude=username):
+                return {"mailError": True}
+            old_email = user_snap.to_dict().get("email")
+            if old_email and email_key(old_email) != new_email_ref.id:
+                transaction.delete(self.emails.document(email_key(old_email)))
+            if not reservation.exists:
+                transaction.create(new_email_ref, {"username": username})
+            transaction.update(user_ref, data)
+            return True
+
+        return update(db.transaction())
+
+    def backfill_email_reservations(self):
+        created, conflicts = 0, []
+        for doc in self.collection.select(["email"]).stream():
+            email = (doc.to_dict() or {}).get("email")
+            if not email:
+                continue
+            try:
+                self.emails.document(email_key(email)).create({"username": doc.id})
+                created += 1
+            except AlreadyExists:
+                owner = self.emails.document(email_key(email)).get().to_dict().get("username")
+                if owner != doc.id:
+                    conflicts.append({"email": email, "username": doc.id, "reserved_by": owner})
+        return {"created": created, "conflicts": conflicts}
 
     def get_users_count(self):
         docs = self.collection.stream()
         return sum(1 for i in docs)
-    
+
     def get_all_users(self):
         docs = self.collection.stream()
         return docs
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import random
+import threading
+
+
+class MissingFixtureError(KeyError):
+    pass
+
+
+def prompt_hash(model_name, prompt):
+    return hashlib.sha256(f"{model_name}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class FixtureStore:
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def load(self, model_name, prompt):
+        key = prompt_hash(model_name, prompt)
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise MissingFixtureError(f"No recorded response for prompt {key[:12]} ({model_name})")
+
+    def save(self, model_name, prompt, response, latency_ms, usage):
+        key = prompt_hash(model_name, prompt)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fixture = {
+            "prompt_hash": key,
+            "model": model_name,
+            "response": response,
+            "latency_ms": latency_ms,
+            "usage": usage,
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, indent=1)
+        os.replace(tmp, path)
+        return fixture
+
+
+class CallStats:
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.latency_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms, usage):
+        usage = usage or {}
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += usage.get("prompt_tokens") or 0
+            self.output_tokens += usage.get("output_tokens") or 0
+            self.latency_ms += latency_ms or 0.0
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "latency_ms": round(self.latency_ms, 1),
+        }
+
+
+class LatencyModel:
+    """Simulated model latency for replay: "none", "recorded", "fixed:MS" or "lognormal:MEDIAN_MS,SIGMA"."""
+
+    def __init__(self, spec="recorded", seed=None):
+        self.spec = spec
+        self.kind, _, args = spec.partition(":")
+        self.args = [float(a) for a in args.split(",")] if args else []
+        if self.kind not in ("none", "recorded", "fixed", "lognormal"):
+            raise ValueError(f"Unknown latency model: {spec}")
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample_ms(self, fixture):
+        if self.kind == "none":
+            return 0.0
+        if self.kind == "recorded":
+            return fixture.get("latency_ms") or 0.0
+        if self.kind == "fixed":
+            return self.args[0]
+        median, sigma = self.args
+        with self._lock:
+            return median * self._rng.lognormvariate(0, sigma)
@@ -2,20 +2,59 @@ import google.genai as genai
 import os
 import json
 import re
+import time
 from dotenv import load_dotenv
+from .ai_replay import FixtureStore, CallStats, LatencyModel
 load_dotenv()
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+client = None
+
+def get_client():
+    # created on first live call so replay runs need no API key
+    global client
+    if client is None:
+        client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    return client
+
+def usage_from_response(response):
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return {}
+    return {
+        "prompt_tokens": getattr(usage, "prompt_token_count", None),
+        "output_tokens": getattr(usage, "candidates_token_count", None),
+    }
 
 class AIService:
-    def __init__(self):
-        self.model_name = "gemini-2.5-flash"
+    def __init__(self, replay_mode=None, fixtures=None, latency_model=None):
+        self.model_name = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+        # live: call Gemini; record: call Gemini and store fixtures; replay: serve fixtures only
+        self.replay_mode = replay_mode or os.getenv("AI_REPLAY_MODE", "live")
+        if fixtures is None and self.replay_mode != "live":
+            fixtures = FixtureStore(os.getenv("AI_FIXTURE_DIR", "tests/fixtures/ai"))
+        self.fixtures = fixtures
+        self.latency_model = latency_model or LatencyModel("none")
+        self.stats = CallStats()
 
     def _call_gemini(self, prompt):
-        response = client.models.generate_content(
+        if self.replay_mode == "replay":
+            fixture = self.fixtures.load(self.model_name, prompt)
+            latency_ms = self.latency_model.sample_ms(fixture)
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            self.stats.record(latency_ms, fixture.get("usage"))
+            return fixture["response"]
+
+        start = time.perf_counter()
+        response = get_client().models.generate_content(
                 model=self.model_name,
                 contents=prompt
         )
         text = response.text.strip()
+        latency_ms = (time.perf_counter() - start) * 1000
+        usage = usage_from_response(response)
+        self.stats.record(latency_ms, usage)
+        if self.replay_mode == "record":
+            self.fixtures.save(self.model_name, prompt, text, latency_ms, usage)
         return text
 
     def classification_agent(self, description):
@@ -0,0 +1,223 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+OPEN_STATUSES = ["Pending", "In Progress", "Ongoing"]
+
+
+def to_epoch(ts):
+    if ts is None:
+        return None
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    if isinstance(ts, str):
+        try:
+            ts = datetime.fromisoformat(ts)
+        except ValueError:
+            return None
+    if isinstance(ts, datetime) and ts.tzinfo is None:
+        # naive datetimes in this app come from utcnow()
+        ts = ts.replace(tzinfo=timezone.utc)
+    if hasattr(ts, "timestamp"):
+        return ts.timestamp()
+    return None
+
+
+class DispatchQueue:
+    """Open incidents ordered by priority, age and cluster size, with claim leases.
+
+    Each incident gets a sort key: the time it was reported plus a
+    priority offset, minus a bonus for large clusters. Every waiting incident
+    ages at the same rate, so a fixed key gives the same order as a
+    time-decaying score. A Low incident that has waited longer than the
+    High/Low offset gap ranks ahead of a new High one. When a cluster grows
+    or shrinks, its queued members are re-keyed, which costs O(k log n) for
+    a cluster of k while its bonus is below the cap. Otherwise enqueue,
+    claim and complete are O(log n).
+    """
+
+    PRIORITY_OFFSETS = {"High": 0, "Medium": 3600, "Low": 4 * 3600}
+
+    def __init__(self, lease_seconds=900, cluster_weight=600, max_cluster_bonus=6, clock=time.time):
+        self.lease_seconds = lease_seconds
+        self.cluster_weight = cluster_weight
+        self.max_cluster_bonus = max_cluster_bonus
+        self.clock = clock
+        self._heap = []
+        self._entries = {}
+        self._stale = 0
+        self._leases = {}
+        self._lease_heap = []
+        self._clusters = defaultdict(set)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _sort_key(self, priority, reported_at, cluster_id):
+        offset = self.PRIORITY_OFFSETS.get(priority, self.PRIORITY_OFFSETS["Low"])
+        bonus = 0
+        if cluster_id is not None:
+            bonus = min(len(self._clusters.get(cluster_id, ())) - 1, self.max_cluster_bonus) * self.cluster_weight
+        return reported_at + offset - bonus
+
+    def _push(self, item):
+        item["key"] = self._sort_key(item["priority"], item["reported_at"], item["cluster_id"])
+        entry = [item["key"], next(self._seq), item["id"], item]
+        self._entries[item["id"]] = entry
+        heapq.heappush(self._heap, entry)
+
+    def _discard(self, incident_id):
+        entry = self._entries.pop(incident_id, None)
+        if entry is None:
+            return None
+        entry[2] = None
+        self._stale += 1
+        if self._stale > 1024 and self._stale > len(self._heap) // 2:
+            self._heap = [e for e in self._heap if e[2] is not None]
+            heapq.heapify(self._heap)
+            self._stale = 0
+        return entry[3]
+
+    def enqueue(self, incident_id, priority="Low", timestamp=None, cluster_id=None):
+        with self._lock:
+            lease = self._leases.get(incident_id)
+            if lease is not None:
+                lease[2].update(priority=priority)
+                return lease[2]
+            previous = self._discard(incident_id)
+            if previous is not None:
+                self._forget_cluster(previous)
+            if cluster_id is not None:
+                self._clusters[cluster_id].add(incident_id)
+            reported_at = to_epoch(timestamp)
+            if reported_at is None:
+                reported_at = previous["reported_at"] if previous else self.clock()
+            item = {
+                "id": incident_id,
+                "priority": priority,
+                "reported_at": reported_at,
+                "cluster_id": cluster_id,
+            }
+            self._push(item)
+            self._rekey_cluster(cluster_id, skip=incident_id)
+            return item
+
+    def claim(self, admin, lease_seconds=None):
+        now = self.clock()
+        with self._lock:
+            self._expire_leases(now)
+            while self._heap:
+                entry = heapq.heappop(self._heap)
+                if entry[2] is None:
+                    self._stale -= 1
+                    continue
+                item = entry[3]
+                del self._entries[item["id"]]
+                expires_at = now + (lease_seconds or self.lease_seconds)
+                self._leases[item["id"]] = [admin, expires_at, item]
+                heapq.heappush(self._lease_heap, (expires_at, item["id"]))
+                return {**item, "claimed_by": admin, "lease_expires_at": expires_at}
+            return None
+
+    def complete(self, incident_id, admin=None):
+        with self._lock:
+            lease = self._leases.get(incident_id)
+            if lease is not None and admin is not None and lease[0] != admin:
+                return False
+            if lease is not None:
+                del self._leases[incident_id]
+                item = lease[2]
+            else:
+                item = self._discard(incident_id)
+            if item is None:
+                return False
+            self._forget_cluster(item)
+            return True
+
+    def release(self, incident_id, admin=None):
+        with self._lock:
+            lease = self._leases.get(incident_id)
+            if lease is None or (admin is not None and lease[0] != admin):
+                return False
+            del self._leases[incident_id]
+            self._push(lease[2])
+            return True
+
+    def remove(self, incident_id):
+        return self.complete(incident_id)
+
+    def restore_claim(self, incident_id, admin, expires_at):
+        with self._lock:
+            item = self._discard(incident_id)
+            if item is None:
+                return False
+            self._leases[incident_id] = [admin, expires_at, item]
+            heapq.heappush(self._lease_heap, (expires_at, incident_id))
+            return True
+
+    def peek(self, n=5):
+        with self._lock:
+            popped = []
+            items = []
+            while self._heap and len(items) < n:
+                entry = heapq.heappop(self._heap)
+                if entry[2] is None:
+                    self._stale -= 1
+                    continue
+                popped.append(entry)
+                items.append(dict(entry[3]))
+            for entry in popped:
+                heapq.heappush(self._heap, entry)
+            return items
+
+    def stats(self):
+        with self._lock:
+            return {"queued": len(self._entries), "claimed": len(self._leases)}
+
+    def load(self, docs):
+        """Rebuilds the queue from open incident documents, e.g. after a restart."""
+        now = self.clock()
+        count = 0
+        for doc in docs:
+            data = doc.to_dict()
+            self.enqueue(doc.id, data.get("priority", "Low"), data.get("timestamp"), data.get("cluster_id"))
+            expires_at = to_epoch(data.get("lease_expires_at"))
+            if data.get("claimed_by") and expires_at and expires_at > now:
+                self.restore_claim(doc.id, data["claimed_by"], expires_at)
+            count += 1
+        return count
+
+    def _expire_leases(self, now):
+        while self._lease_heap and self._lease_heap[0][0] <= now:
+            expires_at, incident_id = heapq.heappop(self._lease_heap)
+            lease = self._leases.get(incident_id)
+            if lease is not None and lease[1] == expires_at:
+                del self._leases[incident_id]
+                self._push(lease[2])
+
+    def _forget_cluster(self, item):
+        cluster_id = item.get("cluster_id")
+        if cluster_id is not None:
+            members = self._clusters.get(cluster_id)
+            if members is not None:
+                members.discard(item["id"])
+                if not members:
+                    del self._clusters[cluster_id]
+            self._rekey_cluster(cluster_id)
+
+    def _rekey_cluster(self, cluster_id, skip=None):
+        members = self._clusters.get(cluster_id)
+        # past the cap the bonus no longer changes, so existing keys stay valid
+        if not members or len(members) > self.max_cluster_bonus + 1:
+            return
+        for incident_id in members:
+            entry = self._entries.get(incident_id)
+            if incident_id == skip or entry is None:
+                continue
+            item = self._discard(incident_id)
+            self._push(item)
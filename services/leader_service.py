@@ -0,0 +1,112 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from repository.lease_repository import LeaseRepository
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class LeaderElector:
+    """Holds a named lease so that only one worker across all processes and nodes runs singleton work.
+
+    The lease is renewed every third of its TTL. A worker that cannot renew steps
+    down once its own copy of the lease runs out, so two leaders can only overlap
+    by the clock skew between hosts.
+    """
+
+    def __init__(self, name, repo=None, holder=None, ttl_seconds=None, on_elected=None, on_demoted=None, clock=time.time):
+        self.name = name
+        self.repo = repo or LeaseRepository()
+        self.holder = holder or worker_id()
+        self.ttl_seconds = ttl_seconds or int(os.getenv("LEADER_LEASE_SECONDS", 30))
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.clock = clock
+        self._expires_at = 0
+        self._leader = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_leader(self):
+        return self._leader and self.clock() < self._expires_at
+
+    def step(self):
+        # measured from before the round trip, so a slow renewal shortens our view of the lease
+        started = self.clock()
+        try:
+            acquired = self.repo.try_acquire(self.name, self.holder, self.ttl_seconds) is not None
+        except Exception as e:
+            print(f"Leader lease {self.name} renewal failed:", e)
+            acquired = None
+        if acquired:
+            self._expires_at = started + self.ttl_seconds
+            if not self._leader:
+                self._leader = True
+                print(f"{self.holder} elected leader for {self.name}")
+                if self.on_elected:
+                    self.on_elected()
+        elif self._leader and (acquired is False or started >= self._expires_at):
+            self._demote()
+        return self.is_leader
+
+    def _demote(self):
+        self._leader = False
+        self._expires_at = 0
+        print(f"{self.holder} lost leadership of {self.name}")
+        if self.on_demoted:
+            self.on_demoted()
+
+    def run(self):
+        while not self._stop.is_set():
+            self.step()
+            self._stop.wait(self.ttl_seconds / 3)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        if self._leader:
+            self._demote()
+            try:
+                self.repo.release(self.name, self.holder)
+            except Exception as e:
+                print(f"Leader lease {self.name} release failed:", e)
+
+
+class PeriodicJob:
+    """Runs fn every interval seconds, but only while the elector holds the lease."""
+
+    def __init__(self, name, fn, interval, elector):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.elector = elector
+        self.runs = 0
+        self._stop = threading.Event()
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            if not self.elector.is_leader:
+                continue
+            try:
+                print(f"{self.name}:", self.fn())
+                self.runs += 1
+            except Exception as e:
+                print(f"{self.name} failed:", e)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,72 @@
+import argparse
+import os
+from datetime import datetime, timedelta, timezone
+from repository.incident_repo import IncidentRepository
+from repository.archive_repository import FirestoreArchiveSink, NdjsonArchiveSink
+
+# each archived incident costs up to 3 writes (archive copy, tombstone, delete) in a 500-write batch
+MAX_BATCH_SIZE = 150
+
+
+class ArchiveJob:
+    job_name = "archive_resolved_incidents"
+
+    def __init__(self, incident_repo=None, sink=None, retention_days=None, batch_size=None):
+        self.incident_repo = incident_repo or IncidentRepository()
+        self.archive_repo = self.incident_repo.archive
+        self.sink = sink or FirestoreArchiveSink()
+        self.retention_days = retention_days or int(os.getenv("ARCHIVE_RETENTION_DAYS", 90))
+        self.batch_size = min(batch_size or int(os.getenv("ARCHIVE_BATCH_SIZE", 100)), MAX_BATCH_SIZE)
+
+    def run(self, max_batches=10, now=None):
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(days=self.retention_days)
+        checkpoint = self.archive_repo.get_checkpoint(self.job_name)
+        cursor = checkpoint.get("cursor_timestamp")
+        archived = skipped = 0
+        finished = False
+
+        for _ in range(max_batches):
+            docs = self.incident_repo.get_archive_candidates(cutoff, after_timestamp=cursor, limit=self.batch_size)
+            if not docs:
+                finished = True
+                break
+            records = []
+            for doc in docs:
+                data = doc.to_dict()
+                resolved_at = data.get("resolved_at") or data.get("timestamp")
+                if resolved_at is not None and resolved_at < cutoff:
+                    records.append((doc.id, data))
+                else:
+                    skipped += 1
+            if records:
+                archived += self.archive_repo.archive(self.sink, records, self.incident_repo.collection)
+            cursor = docs[-1].to_dict().get("timestamp")
+            self.archive_repo.save_checkpoint(self.job_name, {
+                "cursor_timestamp": cursor,
+                "archived_total": checkpoint.get("archived_total", 0) + archived,
+                "updated_at": now,
+            })
+            if len(docs) < self.batch_size:
+                finished = True
+                break
+
+        if finished:
+            # pass complete; the next run rescans incidents that were not old enough yet
+            self.archive_repo.save_checkpoint(self.job_name, {
+                "cursor_timestamp": None,
+                "archived_total": checkpoint.get("archived_total", 0) + archived,
+                "updated_at": now,
+            })
+        return {"archived": archived, "skipped": skipped, "pass_complete": finished}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive incidents resolved more than N days ago.")
+    parser.add_argument("--days", type=int)
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--max-batches", type=int, default=10)
+    parser.add_argument("--sink", choices=["firestore", "ndjson"], default=os.getenv("ARCHIVE_SINK", "firestore"))
+    args = parser.parse_args()
+    sink = NdjsonArchiveSink() if args.sink == "ndjson" else FirestoreArchiveSink()
+    print(ArchiveJob(sink=sink, retention_days=args.days, batch_size=args.batch_size).run(args.max_batches))
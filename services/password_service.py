@@ -0,0 +1,103 @@
+import hmac
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HasherBusyError(Exception):
+    pass
+
+
+class PasswordHasher:
+    # method is a werkzeug method string, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000"
+    def __init__(self, method=None, max_workers=None, max_pending=None, wait_timeout=None):
+        self.method = method or os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+        self.max_workers = max_workers or int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+        max_pending = max_pending or int(os.getenv("PASSWORD_HASH_MAX_PENDING", self.max_workers * 4))
+        self.wait_timeout = wait_timeout if wait_timeout is not None else float(os.getenv("PASSWORD_HASH_WAIT_TIMEOUT", 5))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pwhash")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        # werkzeug fills in defaults for shorthand methods ("scrypt", "pbkdf2:sha256"), so compare
+        # stored hashes against the prefix it actually writes rather than the configured string
+        self._prefix = generate_password_hash("", self.method).split("$", 1)[0]
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.wait_timeout):
+            raise HasherBusyError("Password hashing pool is saturated")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # the slot is held until the task itself finishes, even if the caller stops waiting
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.wait_timeout)
+        except FutureTimeout:
+            raise HasherBusyError("Password hashing timed out")
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored, password, allow_plaintext=False):
+        if not stored or not password:
+            return False
+        if not is_hashed(stored):
+            # Legacy plaintext credentials only exist for admins; compared in constant time
+            return allow_plaintext and hmac.compare_digest(stored.encode("utf-8"), password.encode("utf-8"))
+        return self._run(check_password_hash, stored, password)
+
+    def needs_rehash(self, stored):
+        if not stored or not is_hashed(stored):
+            return True
+        return stored.split("$", 1)[0] != self._prefix
+
+
+def is_hashed(stored):
+    return stored.count("$") == 2 and stored.split("$", 1)[0].startswith(("scrypt", "pbkdf2"))
+
+
+class LoginThrottle:
+    """Sliding-window failed-attempt counter keyed by username and client IP."""
+
+    def __init__(self, max_per_user=None, max_per_ip=None, window_seconds=None, clock=time.monotonic):
+        self.max_per_user = max_per_user or int(os.getenv("LOGIN_MAX_FAILURES_PER_USER", 5))
+        self.max_per_ip = max_per_ip or int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", 20))
+        self.window = window_seconds or int(os.getenv("LOGIN_THROTTLE_WINDOW", 300))
+        self.clock = clock
+        self._failures = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def _count(self, key, now):
+        attempts = self._failures.get(key)
+        if not attempts:
+            return 0
+        while attempts and now - attempts[0] > self.window:
+            attempts.popleft()
+        if not attempts:
+            del self._failures[key]
+            return 0
+        return len(attempts)
+
+    def is_blocked(self, username, ip=None):
+        now = self.clock()
+        with self._lock:
+            if self._count(("user", username), now) >= self.max_per_user:
+                return True
+            if ip and self._count(("ip", ip), now) >= self.max_per_ip:
+                return True
+        return False
+
+    def record_failure(self, username, ip=None):
+        now = self.clock()
+        with self._lock:
+            self._failures[("user", username)].append(now)
+            if ip:
+                self._failures[("ip", ip)].append(now)
+
+    def reset(self, username):
+        with self._lock:
+            self._failures.pop(("user", username), None)
@@ -0,0 +1,93 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from flask import render_template, request, Response, stream_template
+from markupsafe import Markup
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+
+
+def _template_version():
+    # ETags change on deploy when any template changes
+    mtimes = []
+    for root, _, files in os.walk(TEMPLATE_DIR):
+        mtimes.extend(os.path.getmtime(os.path.join(root, f)) for f in files)
+    return str(max(mtimes, default=0))
+
+
+TEMPLATE_VERSION = _template_version()
+
+
+def row_digest(row):
+    return hashlib.blake2b(repr(sorted(row.items())).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def page_etag(*parts):
+    h = hashlib.blake2b(TEMPLATE_VERSION.encode("utf-8"), digest_size=16)
+    for part in parts:
+        h.update(repr(part).encode("utf-8"))
+    return h.hexdigest()
+
+
+class FragmentCache:
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or int(os.getenv("FRAGMENT_CACHE_SIZE", 20000))
+        self._entries = OrderedDict()
+        self._by_owner = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, template_name, owner, row, **context):
+        key = (template_name, owner, row_digest(row))
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return html
+        html = Markup(render_template(template_name, row=row, **context))
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = html
+            self._by_owner.setdefault(owner, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._discard_owner_key(old_key)
+        return html
+
+    def render_rows(self, template_name, rows, owner_field="id"):
+        for row in rows:
+            yield row, self.render(template_name, row.get(owner_field), row)
+
+    def invalidate(self, owner):
+        with self._lock:
+            for key in self._by_owner.pop(owner, ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_owner.clear()
+
+    def _discard_owner_key(self, key):
+        keys = self._by_owner.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_owner[key[1]]
+
+
+def render_with_etag(template_name, etag, stream=True, **context):
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    if stream:
+        response = Response(stream_template(template_name, **context), mimetype="text/html")
+    else:
+        response = Response(render_template(template_name, **context), mimetype="text/html")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
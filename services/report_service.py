@@ -1,15 +1,17 @@
 import os
-from flask import url_for
-from werkzeug.utils import secure_filename
 from .ai_service import AIService
+from .upload_service import save_upload, IMAGE_TYPES, MEDIA_TYPES
 from repository.incident_repo import IncidentRepository
 from google.cloud import firestore
+from datetime import datetime
 import json
+from collections import Counter
 from google.cloud import pubsub_v1
 publisher = pubsub_v1.PublisherClient()
 project_id = os.getenv("GCP_PROJECT_ID")
 topic_id = os.getenv("PUBSUB_TOPIC")
 topic_path = publisher.topic_path(project_id, topic_id)
+PROOF_DIR = "static/uploads/proofs"
 class ReportService:
     def __init__(self):
         self.repo = IncidentRepository()
@@ -30,9 +32,7 @@ class ReportService:
 
         media = files.get("media")
         if media:
-            filename = secure_filename(media.filename)
-            media.save(os.path.join("static/uploads", filename))
-            incident["media_url"] = url_for('static', filename=f"uploads/{filename}")
+            incident["media_url"] = save_upload(media, "static/uploads", MEDIA_TYPES, "uploads")
 
         if self.ai_service:
             ai_result = self.ai_service.classify_incident(incident["description"])
@@ -46,9 +46,55 @@ class ReportService:
         try:
             message_data = incident.copy()
             message_data["incident_id"] = incident_id
+            message_data["timestamp"] = datetime.utcnow().isoformat()
             message_json = json.dumps(message_data).encode("utf-8")
             publisher.publish(topic_path, message_json)
         except Exception as e:
             print("Error publishing to Pub/Sub:", e)
 
-        return incident_id
\ No newline at end of file
+        return incident_id, incident
+
+    def save_proof(self, proof, unique=False):
+        return save_upload(proof, PROOF_DIR, IMAGE_TYPES, "uploads/proofs", unique=unique)
+
+    def discard_proof(self, url):
+        try:
+            os.remove(os.path.join(PROOF_DIR, os.path.basename(url)))
+        except FileNotFoundError:
+            pass
+
+    def bulk_update_status(self, incident_ids, status, proofs=None, expected_versions=None):
+        # a shared proof is the same upload for every incident, so it is only written once;
+        # unique names keep a rejected update from overwriting another incident's proof
+        saved = {}
+        proof_urls = {}
+        try:
+            for incident_id, proof in (proofs or {}).items():
+                if id(proof) not in saved:
+                    saved[id(proof)] = self.save_proof(proof, unique=True)
+                proof_urls[incident_id] = saved[id(proof)]
+            result = self.repo.bulk_update_status(incident_ids, status, proof_urls, expected_versions)
+        except BaseException:
+            for url in saved.values():
+                self.discard_proof(url)
+            raise
+        # conflicts and missing incidents never reference their proof
+        used = {proof_urls[i] for i in result["updated"] if i in proof_urls}
+        for url in set(saved.values()) - used:
+            self.discard_proof(url)
+        if result["updated"]:
+            transitions = Counter(f"{old}->{status}" for old in result["previous_status"].values())
+            self.publish_event({
+                "event": "incidents_updated",
+                "status": status,
+                "incident_ids": result["updated"],
+                "proofs": {i: proof_urls[i] for i in result["updated"] if i in proof_urls},
+                "counts": dict(transitions),
+            })
+        return result
+
+    def publish_event(self, message_data):
+        try:
+            publisher.publish(topic_path, json.dumps(message_data).encode("utf-8"))
+        except Exception as e:
+            print("Error publishing to Pub/Sub:", e)
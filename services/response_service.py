@@ -0,0 +1,121 @@
+import gzip
+from flask import Response, jsonify
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+REPORT_FIELDS = (
+    "id", "type", "category", "description", "summary", "location",
+    "priority", "status", "media_url", "proof_image", "timestamp", "submitted_by",
+)
+DEFAULT_LIST_FIELDS = (
+    "type", "category", "summary", "location", "priority", "status", "media_url", "timestamp",
+)
+REPORT_DEFAULTS = {"priority": "Low", "status": "Pending"}
+MSGPACK_MIMETYPE = "application/x-msgpack"
+COMPRESSIBLE_MIMETYPES = ("application/json", MSGPACK_MIMETYPE)
+MIN_COMPRESS_SIZE = 500
+
+
+def format_timestamp(ts):
+    if hasattr(ts, "strftime"):
+        return ts.strftime("%Y-%m-%d %H:%M:%S")
+    return str(ts)
+
+
+def parse_fields(raw, default=DEFAULT_LIST_FIELDS):
+    if not raw:
+        return list(default)
+    if raw == "*":
+        return list(REPORT_FIELDS)
+    fields = [f.strip() for f in raw.split(",") if f.strip() in REPORT_FIELDS]
+    return fields or list(default)
+
+
+def storage_fields(fields):
+    # "id" is the document id, not a stored field, so it cannot be selected
+    return [f for f in fields if f != "id"]
+
+
+def serialize_reports(docs, fields):
+    reports = []
+    raw_timestamps = []
+    want_id = "id" in fields
+    want_ts = "timestamp" in fields
+    stored = storage_fields(fields)
+    for doc in docs:
+        data = doc.to_dict() or {}
+        r = {f: data.get(f, REPORT_DEFAULTS.get(f)) for f in stored}
+        if want_id:
+            r["id"] = doc.id
+        if want_ts:
+            raw_timestamps.append(data.get("timestamp"))
+        reports.append(r)
+    if want_ts:
+        for r, ts in zip(reports, format_timestamps(raw_timestamps)):
+            r["timestamp"] = ts
+    return reports
+
+
+def format_timestamps(timestamps):
+    # Reports submitted in the same second share a formatted value, so burst
+    # traffic only pays for strftime once per distinct second.
+    cache = {}
+    out = []
+    for ts in timestamps:
+        key = ts.replace(microsecond=0) if hasattr(ts, "replace") and hasattr(ts, "strftime") else ts
+        try:
+            formatted = cache.get(key)
+        except TypeError:
+            formatted = None
+            key = None
+        if formatted is None:
+            formatted = format_timestamp(ts)
+            if key is not None:
+                cache[key] = formatted
+        out.append(formatted)
+    return out
+
+
+def wants_msgpack(request):
+    if msgpack is None:
+        return False
+    if request.args.get("format") == "msgpack":
+        return True
+    best = request.accept_mimetypes.best_match(["application/json", MSGPACK_MIMETYPE])
+    return best == MSGPACK_MIMETYPE
+
+
+def encode_payload(request, payload):
+    if wants_msgpack(request):
+        return Response(msgpack.packb(payload, use_bin_type=True, default=str), mimetype=MSGPACK_MIMETYPE)
+    return jsonify(payload)
+
+
+def compress_response(request, response):
+    if response.direct_passthrough or response.status_code < 200 or response.status_code >= 300:
+        return response
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES or "Content-Encoding" in response.headers:
+        return response
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_SIZE:
+        return response
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        response.set_data(brotli.compress(body, quality=5))
+        response.headers["Content-Encoding"] = "br"
+    elif accepted["gzip"]:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        return response
+    response.vary.add("Accept-Encoding")
+    return response
+
@@ -0,0 +1,211 @@
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+from services.dispatch_queue import to_epoch
+
+FILTER_FIELDS = ("type", "category", "status", "priority")
+# counting every match of a very common term costs more than the page itself
+MAX_COUNT = 10000
+# above this many matches, bm25 ranking dominates query time; such broad queries return newest first
+RANK_LIMIT = 2000
+TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS incident_meta (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT UNIQUE NOT NULL,
+    type TEXT,
+    category TEXT,
+    status TEXT,
+    priority TEXT,
+    ts REAL
+);
+CREATE INDEX IF NOT EXISTS incident_meta_status ON incident_meta(status);
+CREATE INDEX IF NOT EXISTS incident_meta_type ON incident_meta(type);
+CREATE INDEX IF NOT EXISTS incident_meta_priority ON incident_meta(priority);
+CREATE VIRTUAL TABLE IF NOT EXISTS incident_fts USING fts5(
+    description, summary, location, tags,
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3 4'
+);
+"""
+
+
+def filter_tag(field, value):
+    # filters are indexed as single tokens so FTS5 intersects them with the text match
+    return "zz" + field + re.sub(r"\W+", "", str(value)).lower()
+
+
+def make_tags(data):
+    return " ".join(filter_tag(field, data.get(field)) for field in FILTER_FIELDS if data.get(field))
+
+
+def build_match(query):
+    """Turns user input into an FTS5 expression: words are ANDed, "quoted text" is a phrase,
+    word* is a prefix match and column:word restricts to description/summary/location."""
+    terms = []
+    for phrase, word in TOKEN_RE.findall(query or ""):
+        if phrase:
+            words = re.findall(r"\w+", phrase)
+            if words:
+                terms.append('"' + " ".join(words) + '"')
+            continue
+        column = None
+        if ":" in word:
+            column, _, word = word.partition(":")
+            if column not in ("description", "summary", "location"):
+                column = None
+        prefix = word.endswith("*")
+        words = re.findall(r"\w+", word)
+        if not words:
+            continue
+        term = '"' + " ".join(words) + '"' + ("*" if prefix else "")
+        terms.append(f"{column} : {term}" if column else term)
+    return " AND ".join(terms)
+
+
+class IncidentSearchIndex:
+    def __init__(self, path=None):
+        self.path = path or os.getenv("SEARCH_INDEX_PATH", "search_index.sqlite3")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        with self._conn:
+            # summary matches weigh double; filter tags do not affect ranking
+            self._conn.execute("INSERT INTO incident_fts(incident_fts, rank) VALUES ('rank', 'bm25(1.0, 2.0, 1.0, 0.0)')")
+
+    def close(self):
+        self._conn.close()
+
+    def upsert(self, incident_id, data):
+        self.upsert_many([(incident_id, data)])
+
+    def upsert_many(self, records):
+        with self._lock, self._conn:
+            for incident_id, data in records:
+                self._upsert(incident_id, data)
+
+    def _upsert(self, incident_id, data):
+        data = {**data, "status": data.get("status") or "Pending", "priority": data.get("priority") or "Low"}
+        meta = tuple(data.get(field) for field in FILTER_FIELDS) + (to_epoch(data.get("timestamp")),)
+        row = self._conn.execute("SELECT rowid FROM incident_meta WHERE id = ?", (incident_id,)).fetchone()
+        if row:
+            rowid = row[0]
+            self._conn.execute(
+                "UPDATE incident_meta SET type=?, category=?, status=?, priority=?, ts=COALESCE(?, ts) WHERE rowid=?",
+                (*meta, rowid))
+            self._conn.execute("DELETE FROM incident_fts WHERE rowid = ?", (rowid,))
+        else:
+            # rowid is the report time in ms, so rowid order is time order even after a rebuild
+            rowid = int((meta[4] or time.time()) * 1000)
+            while self._conn.execute("SELECT 1 FROM incident_meta WHERE rowid = ?", (rowid,)).fetchone():
+                rowid += 1
+            self._conn.execute(
+                "INSERT INTO incident_meta (rowid, id, type, category, status, priority, ts) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (rowid, incident_id, *meta))
+        self._conn.execute(
+            "INSERT INTO incident_fts (rowid, description, summary, location, tags) VALUES (?, ?, ?, ?, ?)",
+            (rowid, data.get("description") or "", data.get("summary") or "", data.get("location") or "", make_tags(data)))
+
+    def update_fields(self, incident_id, **fields):
+        fields = {k: v for k, v in fields.items() if k in FILTER_FIELDS and v}
+        if not fields:
+            return
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT m.rowid, m.type, m.category, m.status, m.priority, f.description, f.summary, f.location "
+                "FROM incident_meta m JOIN incident_fts f ON f.rowid = m.rowid WHERE m.id = ?", (incident_id,)).fetchone()
+            if not row:
+                return
+            rowid, *values = row
+            data = {**dict(zip(FILTER_FIELDS + ("description", "summary", "location"), values)), **fields}
+            assignments = ", ".join(f"{k} = ?" for k in fields)
+            self._conn.execute(f"UPDATE incident_meta SET {assignments} WHERE rowid = ?", (*fields.values(), rowid))
+            self._conn.execute("DELETE FROM incident_fts WHERE rowid = ?", (rowid,))
+            self._conn.execute(
+                "INSERT INTO incident_fts (rowid, description, summary, location, tags) VALUES (?, ?, ?, ?, ?)",
+                (rowid, data["description"], data["summary"], data["location"], make_tags(data)))
+
+    def delete(self, incident_id):
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT rowid FROM incident_meta WHERE id = ?", (incident_id,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM incident_fts WHERE rowid = ?", (row[0],))
+                self._conn.execute("DELETE FROM incident_meta WHERE rowid = ?", (row[0],))
+
+    def search(self, query="", filters=None, date_from=None, date_to=None, page=1, per_page=20):
+        filters = {k: v for k, v in (filters or {}).items() if k in FILTER_FIELDS and v}
+        match = build_match(query)
+        where, params = [], []
+        if match:
+            tag_terms = [f'tags : "{filter_tag(field, value)}"' for field, value in filters.items()]
+            source = "incident_fts f JOIN incident_meta m ON m.rowid = f.rowid"
+            where.append("incident_fts MATCH ?")
+            params.append(" AND ".join([match] + tag_terms))
+            rowid_column = "f.rowid"
+        else:
+            source = "incident_meta m"
+            for field, value in filters.items():
+                where.append(f"m.{field} = ?")
+                params.append(value)
+            rowid_column = "m.rowid"
+        # rowids are report times in ms, so date ranges are rowid ranges
+        if date_from is not None:
+            where.append(f"{rowid_column} >= ?")
+            params.append(int(to_epoch(date_from) * 1000))
+        if date_to is not None:
+            where.append(f"{rowid_column} < ?")
+            params.append(int(to_epoch(date_to) * 1000))
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        per_page = max(1, min(int(per_page), 100))
+        page = max(1, int(page))
+        with self._lock:
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM (SELECT 1 FROM {source} {clause} LIMIT ?)", (*params, MAX_COUNT + 1)).fetchone()[0]
+            ranked = bool(match) and total <= RANK_LIMIT
+            # ordering on the rowid lets SQLite stream matches newest-first instead of sorting them
+            order = f"f.rank, {rowid_column} DESC" if ranked else f"{rowid_column} DESC"
+            rows = self._conn.execute(
+                f"SELECT m.id, m.type, m.category, m.status, m.priority, m.ts FROM {source} {clause} "
+                f"ORDER BY {order} LIMIT ? OFFSET ?",
+                (*params, per_page, (page - 1) * per_page)).fetchall()
+        results = [dict(zip(("id", "type", "category", "status", "priority", "ts"), row)) for row in rows]
+        return {"total": min(total, MAX_COUNT), "total_capped": total > MAX_COUNT,
+                "order": "relevance" if ranked else "recent",
+                "page": page, "per_page": per_page, "results": results}
+
+    def rebuild(self, docs, batch_size=500):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM incident_fts")
+            self._conn.execute("DELETE FROM incident_meta")
+        count = 0
+        batch = []
+        for doc in docs:
+            batch.append((doc.id, doc.to_dict()))
+            if len(batch) >= batch_size:
+                self.upsert_many(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            self.upsert_many(batch)
+            count += len(batch)
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO incident_fts(incident_fts) VALUES ('optimize')")
+        return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incident full-text search index.")
+    parser.add_argument("--rebuild", action="store_true", help="reindex every incident from Firestore")
+    parser.add_argument("--path")
+    args = parser.parse_args()
+    if args.rebuild:
+        from repository.incident_repo import IncidentRepository
+        fields = ["description", "summary", "location", "type", "category", "status", "priority", "timestamp"]
+        index = IncidentSearchIndex(args.path)
+        print("Indexed", index.rebuild(IncidentRepository().get_all_reports(fields=fields)), "incidents")
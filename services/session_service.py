@@ -0,0 +1,204 @@
+import json
+import os
+import secrets
+import threading
+import time
+from datetime import timedelta
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import Signer, BadSignature
+from werkzeug.datastructures import CallbackDict
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+        CallbackDict.__init__(self, initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class MemorySessionStore:
+    def __init__(self, sweep_every=1000, clock=time.monotonic):
+        self._sessions = {}
+        self._by_user = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.sweep_every = sweep_every
+        self.clock = clock
+
+    def get(self, sid):
+        with self._lock:
+            entry = self._sessions.get(sid)
+            if not entry:
+                return None
+            expires_at, data, _ = entry
+            if expires_at <= self.clock():
+                self._drop(sid)
+                return None
+            return dict(data)
+
+    def set(self, sid, data, ttl, username=None):
+        with self._lock:
+            previous = self._sessions.get(sid)
+            if previous and previous[2] and previous[2] != username:
+                self._by_user.get(previous[2], set()).discard(sid)
+            self._sessions[sid] = (self.clock() + ttl, dict(data), username)
+            if username:
+                self._by_user.setdefault(username, set()).add(sid)
+            self._writes += 1
+            if self._writes % self.sweep_every == 0:
+                self._sweep()
+
+    def delete(self, sid):
+        with self._lock:
+            self._drop(sid)
+
+    def revoke_user(self, username, keep=None):
+        with self._lock:
+            for sid in list(self._by_user.get(username, ())):
+                if sid != keep:
+                    self._drop(sid)
+
+    def _drop(self, sid):
+        entry = self._sessions.pop(sid, None)
+        if entry and entry[2]:
+            sids = self._by_user.get(entry[2])
+            if sids is not None:
+                sids.discard(sid)
+                if not sids:
+                    del self._by_user[entry[2]]
+
+    def _sweep(self):
+        now = self.clock()
+        for sid in [sid for sid, entry in self._sessions.items() if entry[0] <= now]:
+            self._drop(sid)
+
+
+class RedisSessionStore:
+    def __init__(self, client, prefix="session:"):
+        self.client = client
+        self.prefix = prefix
+
+    def _user_key(self, username):
+        return f"{self.prefix}user:{username}"
+
+    def get(self, sid):
+        raw = self.client.get(self.prefix + sid)
+        return json.loads(raw) if raw else None
+
+    def set(self, sid, data, ttl, username=None):
+        pipe = self.client.pipeline()
+        pipe.setex(self.prefix + sid, int(ttl), json.dumps(data))
+        if username:
+            # the index outlives its longest session: set a TTL on a new key, otherwise only ever extend it
+            pipe.sadd(self._user_key(username), sid)
+            pipe.expire(self._user_key(username), int(ttl), nx=True)
+            pipe.expire(self._user_key(username), int(ttl), gt=True)
+        pipe.execute()
+
+    def delete(self, sid):
+        self.client.delete(self.prefix + sid)
+
+    def revoke_user(self, username, keep=None):
+        sids = [s.decode() if isinstance(s, bytes) else s for s in self.client.smembers(self._user_key(username))]
+        revoked = [sid for sid in sids if sid != keep]
+        if not revoked:
+            return
+        pipe = self.client.pipeline()
+        pipe.delete(*[self.prefix + sid for sid in revoked])
+        pipe.srem(self._user_key(username), *revoked)
+        pipe.execute()
+
+
+class ServerSideSessionInterface(SessionInterface):
+    salt = "server-session"
+
+    def __init__(self, store, idle_timeout=timedelta(minutes=30)):
+        self.store = store
+        self.idle_timeout = idle_timeout
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt=self.salt)
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode()
+            except BadSignature:
+                sid = None
+            data = self.store.get(sid) if sid else None
+            if data is not None:
+                return ServerSession(data, sid=sid)
+        return ServerSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if not session:
+            if not session.new:
+                self.store.delete(session.sid)
+            if session.modified:
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        # refreshed on every request so idle sessions expire server-side
+        ttl = app.permanent_session_lifetime if session.permanent else self.idle_timeout
+        self.store.set(session.sid, dict(session), ttl.total_seconds(), username=session_username(session))
+        if not self.should_set_cookie(app, session):
+            return
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid).decode(),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+    def regenerate(self, session):
+        # new id after login, so a pre-login session id cannot be fixated
+        if not session.new:
+            self.store.delete(session.sid)
+        session.sid = secrets.token_urlsafe(32)
+        session.modified = True
+
+
+def session_username(session):
+    ctx = session.get("ctx")
+    username = ctx.get("username") if isinstance(ctx, dict) else session.get("user")
+    # only plain names are indexed for revocation; anything else stays unindexed
+    return username if isinstance(username, str) and username else None
+
+
+def create_session_interface():
+    idle_timeout = timedelta(seconds=int(os.getenv("SESSION_IDLE_TIMEOUT", 1800)))
+    backend = os.getenv("SESSION_BACKEND", "memory")
+    if backend == "redis":
+        if redis is None:
+            raise RuntimeError("SESSION_BACKEND=redis requires the redis package")
+        client = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        return ServerSideSessionInterface(RedisSessionStore(client), idle_timeout)
+    if os.getenv("SOCKETIO_MESSAGE_QUEUE"):
+        # a message queue means several workers, and each would keep its own in-memory sessions
+        raise RuntimeError("SOCKETIO_MESSAGE_QUEUE requires SESSION_BACKEND=redis so workers share sessions")
+    return ServerSideSessionInterface(MemorySessionStore(), idle_timeout)
+
+
+def build_user_context(user, role="user"):
+    return {
+        "username": user.get("username"),
+        "role": role,
+        "name": user.get("name") or user.get("username"),
+        "email": user.get("email"),
+        "phone": user.get("phone"),
+    }
@@ -0,0 +1,150 @@
+import functools
+import os
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+from flask import request, session, jsonify, url_for
+from werkzeug.utils import secure_filename
+
+MB = 1024 * 1024
+# os.umask can only be read by setting it, so it is read once at import
+UMASK = os.umask(0o022)
+os.umask(UMASK)
+
+SIGNATURES = {
+    "image/jpeg": [(0, b"\xff\xd8\xff")],
+    "image/png": [(0, b"\x89PNG\r\n\x1a\n")],
+    "image/gif": [(0, b"GIF87a"), (0, b"GIF89a")],
+    "image/webp": [(8, b"WEBP")],
+    "video/mp4": [(4, b"ftyp")],
+    "video/webm": [(0, b"\x1a\x45\xdf\xa3")],
+}
+IMAGE_TYPES = ("image/jpeg", "image/png", "image/gif", "image/webp")
+MEDIA_TYPES = IMAGE_TYPES + ("video/mp4", "video/webm")
+
+
+class UploadRejected(Exception):
+    def __init__(self, detail, status_code=400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+def sniff_type(stream):
+    head = stream.read(16)
+    stream.seek(0)
+    for mimetype, signatures in SIGNATURES.items():
+        for offset, magic in signatures:
+            if head[offset:offset + len(magic)] == magic:
+                return mimetype
+    return None
+
+
+def save_upload(file, directory, allowed_types, url_prefix, unique=False):
+    mimetype = sniff_type(file.stream)
+    if mimetype not in allowed_types:
+        raise UploadRejected("Unsupported file type", 415)
+    filename = secure_filename(file.filename)
+    if not filename:
+        raise UploadRejected("Invalid file name")
+    if unique:
+        filename = f"{uuid.uuid4().hex[:12]}-{filename}"
+    os.makedirs(directory, exist_ok=True)
+    with uploads.slot():
+        # written beside the target and renamed, so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                file.save(tmp)
+            # mkstemp creates 0600; give the file the mode a plain open() would, so static servers can read it
+            os.chmod(tmp_path, 0o666 & ~UMASK)
+            os.replace(tmp_path, os.path.join(directory, filename))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return url_for("static", filename=f"{url_prefix}/{filename}")
+
+
+class UploadAdmission:
+    def __init__(self, max_global=None, max_per_user=None, queue_timeout=None):
+        self.max_global = max_global or int(os.getenv("UPLOAD_MAX_CONCURRENT", 8))
+        self.max_per_user = max_per_user or int(os.getenv("UPLOAD_MAX_PER_USER", 2))
+        self.queue_timeout = queue_timeout if queue_timeout is not None else float(os.getenv("UPLOAD_QUEUE_TIMEOUT", 10))
+        self._slots = threading.BoundedSemaphore(self.max_global)
+        self._lock = threading.Lock()
+        self._per_user = {}
+        self.metrics = {"active": 0, "waiting": 0, "admitted": 0, "rejected_size": 0,
+                        "rejected_user_limit": 0, "rejected_busy": 0}
+
+    def _count(self, key, delta=1):
+        with self._lock:
+            self.metrics[key] += delta
+
+    def check_length(self, content_length, limit):
+        if content_length is not None and content_length > limit:
+            self._count("rejected_size")
+            raise UploadRejected(f"Upload exceeds {limit // MB} MB limit", 413)
+
+    @contextmanager
+    def slot(self):
+        self._count("waiting")
+        acquired = self._slots.acquire(timeout=self.queue_timeout)
+        self._count("waiting", -1)
+        if not acquired:
+            self._count("rejected_busy")
+            raise UploadRejected("Server is busy, please retry", 503)
+        self._count("active")
+        try:
+            yield
+        finally:
+            self._count("active", -1)
+            self._slots.release()
+
+    @contextmanager
+    def admit(self, user):
+        with self._lock:
+            if self._per_user.get(user, 0) >= self.max_per_user:
+                self.metrics["rejected_user_limit"] += 1
+                raise UploadRejected("Too many uploads in progress", 429)
+            self._per_user[user] = self._per_user.get(user, 0) + 1
+        try:
+            with self.slot():
+                self._count("admitted")
+                yield
+        finally:
+            with self._lock:
+                self._per_user[user] -= 1
+                if not self._per_user[user]:
+                    del self._per_user[user]
+
+    def guard(self, limit):
+        """Rejects oversized POSTs before the body is read and parses multipart bodies inside an upload slot.
+
+        The slot is released before the view runs; save_upload takes one again for the write.
+        """
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if request.method != "POST":
+                    return view(*args, **kwargs)
+                try:
+                    self.check_length(request.content_length, limit)
+                    if request.mimetype == "multipart/form-data":
+                        with self.admit(str(session.get("user") or request.remote_addr)):
+                            # reads and parses the whole body, spooling large files to disk
+                            request.files
+                    return view(*args, **kwargs)
+                except UploadRejected as e:
+                    return jsonify({"status": "error", "detail": e.detail}), e.status_code
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.metrics, "users_uploading": len(self._per_user),
+                    "max_concurrent": self.max_global, "max_per_user": self.max_per_user}
+
+
+uploads = UploadAdmission()
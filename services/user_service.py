@@ -1,38 +1,44 @@
+import argparse
 import re
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from repository.user_repository import UserRepository
+from repository.admin_repository import AdminRepository
 from email_validator import validate_email, EmailNotValidError
+from .password_service import PasswordHasher, LoginThrottle, HasherBusyError
 class UserService:
     def __init__(self):
         self.repo = UserRepository()
+        self.admin_repo = AdminRepository()
+        self.hasher = PasswordHasher()
+        self.throttle = LoginThrottle()
 
     def validate_registration(self, data):
+        errors = self.validate_password_rules(data["password"], data["confirm_password"])
+        if not data["phone"].isdigit() or len(data["phone"]) < 10:
+            errors["phoneError"] = True
+        if not self.validate_email(data["email"]):
+            errors["mailNotValidError"] = True
+        # username and email conflicts are reported by the save_user transaction
+        return errors
+
+    def validate_password_rules(self, password, confirm_password):
         errors = {}
-        if self.repo.get_user_by_username(data["username"]):
-            errors["userError"] = True
-        if data["password"] != data["confirm_password"]:
+        if password != confirm_password:
             errors["passError"] = True
-        if len(data["password"]) < 8:
+        if len(password) < 8:
             errors["lengthError"] = True
-        if not re.search(r"[A-Z]", data["password"]):
+        if not re.search(r"[A-Z]", password):
             errors["upperCaseError"] = True
-        if not re.search(r"[a-z]", data["password"]):
+        if not re.search(r"[a-z]", password):
             errors["lowerCaseError"] = True
-        if not re.search(r"[0-9]", data["password"]):
+        if not re.search(r"[0-9]", password):
             errors["numberError"] = True
-        if not re.search(r"[@$!%*?&#]", data["password"]):
+        if not re.search(r"[@$!%*?&#]", password):
             errors["specialCharError"] = True
-        if not data["phone"].isdigit() or len(data["phone"]) < 10:
-            errors["phoneError"] = True
-        if self.repo.get_user_by_email(data["email"]):
-            errors["mailError"] = True
-        if not self.validate_email(data["email"]):
-            errors["mailNotValidError"] = True
         return errors
 
     def register_user(self, data):
-        hashed_pw = generate_password_hash(data["password"])
+        hashed_pw = self.hasher.hash(data["password"])
         user_dict = {
             "name": data["name"],
             "username": data["username"],
@@ -41,65 +47,105 @@ class UserService:
             "password": hashed_pw,
             "created_at": datetime.utcnow()
         }
-        self.repo.save_user(user_dict)
+        return self.repo.save_user(user_dict)
 
-    def authenticate_user(self, username, password):
+    def authenticate_user(self, username, password, ip=None):
+        if self.throttle.is_blocked(username, ip):
+            return None, "Too many login attempts. Please try again later."
         user = self.repo.get_user_by_username(username)
         if not user:
+            self.throttle.record_failure(username, ip)
             return None, "User not found"
-        if not check_password_hash(user["password"], password):
+        try:
+            valid = self.hasher.verify(user["password"], password)
+        except HasherBusyError:
+            return None, "Server is busy. Please try again."
+        if not valid:
+            self.throttle.record_failure(username, ip)
             return None, "Invalid password"
+        self.throttle.reset(username)
+        if self.hasher.needs_rehash(user["password"]):
+            self._rehash(lambda hashed: self.repo.update_user(username, {"password": hashed}), password)
         return user, None
 
+    def authenticate_admin(self, username, password, ip=None):
+        throttle_key = f"admin:{username}"
+        if self.throttle.is_blocked(throttle_key, ip):
+            return None, "Too many login attempts. Please try again later."
+        admin = self.admin_repo.get_admin_by_username(username)
+        if not admin:
+            self.throttle.record_failure(throttle_key, ip)
+            return None, "Invalid Username"
+        try:
+            valid = self.hasher.verify(admin.get("password"), password, allow_plaintext=True)
+        except HasherBusyError:
+            return None, "Server is busy. Please try again."
+        if not valid:
+            self.throttle.record_failure(throttle_key, ip)
+            return None, "Invalid Password"
+        self.throttle.reset(throttle_key)
+        if self.hasher.needs_rehash(admin.get("password")):
+            # also migrates legacy plaintext admin passwords to hashes
+            self._rehash(lambda hashed: self.admin_repo.update_admin(admin["doc_id"], {"password": hashed}), password)
+        return admin, None
+
+    def _rehash(self, save, password):
+        try:
+            save(self.hasher.hash(password))
+        except Exception as e:
+            print("Password rehash failed:", e)
+
     def validate_profile_update(self, username, data):
         errors = {}
-        existing_user = self.repo.get_user_by_email(data["email"])
-        if existing_user and existing_user["username"] != username:
-            errors["mailError"] = True
-        if not self.validate_email(existing_user["email"]):
+        if not self.validate_email(data["email"]):
             errors["mailNotValidError"] = True
+        elif self.repo.get_email_owner(data["email"]) not in (None, username):
+            errors["mailError"] = True
         if not data["phone"].isdigit() or len(data["phone"]) < 10:
             errors["phoneError"] = True
         return errors
 
     def update_profile(self, username, data):
-        errors = self.validate_profile_update(username, data)
-        if errors:
-            return {"status": "error", "errors": errors}
-        self.repo.update_user(username, {
+        result = self.repo.update_user(username, {
             "name": data["name"],
             "email": data["email"],
             "phone": data["phone"],
             "updated_at": datetime.utcnow()
         })
+        if result is None:
+            return {"status": "error", "errors": {"userError": True}}
+        if isinstance(result, dict):
+            return {"status": "error", "errors": result}
         return {"status": "success", "message": "Profile updated successfully"}
 
-    def validate_password_change(self, current_username, current_password, new_password, confirm_password):
+    def validate_password_change(self, current_username, current_password, new_password, confirm_password, ip=None):
+        throttle_key = f"change_password:{current_username}"
+        if self.throttle.is_blocked(throttle_key, ip):
+            return {"throttleError": True}
         errors = {}
         user = self.repo.get_user_by_username(current_username)
-        if not user or not check_password_hash(user["password"], current_password):
+        try:
+            valid = bool(user) and self.hasher.verify(user["password"], current_password)
+        except HasherBusyError:
+            return {"busyError": True}
+        if valid:
+            self.throttle.reset(throttle_key)
+        else:
+            self.throttle.record_failure(throttle_key, ip)
             errors["currentPassError"] = True
-        if new_password != confirm_password:
-            errors["passError"] = True
-        if len(new_password) < 8:
-            errors["lengthError"] = True
-        if not re.search(r"[A-Z]", new_password):
-            errors["upperCaseError"] = True
-        if not re.search(r"[a-z]", new_password):
-            errors["lowerCaseError"] = True
-        if not re.search(r"[0-9]", new_password):
-            errors["numberError"] = True
-        if not re.search(r"[@$!%*?&#]", new_password):
-            errors["specialCharError"] = True
+        errors.update(self.validate_password_rules(new_password, confirm_password))
         return errors
 
     def change_password(self, username, current_password, new_password, confirm_password):
         errors = self.validate_password_change(username, current_password, new_password, confirm_password)
         if errors:
             return {"status": "error", "errors": errors}
-        hashed_pw = generate_password_hash(new_password)
-        self.repo.update_user(username, {"password": hashed_pw, "updated_at": datetime.utcnow()})
+        self.set_password(username, new_password)
         return {"status": "success", "message": "Password changed successfully"}
+
+    def set_password(self, username, new_password):
+        hashed_pw = self.hasher.hash(new_password)
+        self.repo.update_user(username, {"password": hashed_pw, "updated_at": datetime.utcnow()})
     
     def validate_email(self, email):
         try:
@@ -107,3 +153,11 @@ class UserService:
             return True
         except EmailNotValidError as e:
             return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="User maintenance tasks.")
+    parser.add_argument("--backfill-emails", action="store_true", help="reserve emails/{email} for users created before reservations")
+    args = parser.parse_args()
+    if args.backfill_emails:
+        print(UserRepository().backfill_email_reservations())
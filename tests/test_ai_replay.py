@@ -0,0 +1,40 @@
+import pytest #type: ignore
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from benchmarks import replay_ai_agents
+
+CORPUS = [
+    {"id": "1", "description": "Bus collided with a car near the flyover.", "type": "Accident", "priority": "High"},
+    {"id": "2", "description": "Streetlight flickering on 5th Avenue.", "type": "Other", "priority": "Low"},
+]
+
+def fake_generate_content(model, contents):
+    if "incident classifier" in contents:
+        text = "Accident" if "collided with a car" in contents else "Other"
+    elif "prioritization agent" in contents:
+        text = "High" if "collided with a car" in contents else "Medium"
+    else:
+        text = "Summary."
+    usage = SimpleNamespace(prompt_token_count=100, candidates_token_count=5)
+    return SimpleNamespace(text=text, usage_metadata=usage)
+
+def test_record_then_replay_offline(tmp_path):
+    client = MagicMock()
+    client.models.generate_content.side_effect = fake_generate_content
+    with patch("services.ai_service.get_client", return_value=client):
+        replay_ai_agents.run(CORPUS, mode="record", fixture_dir=str(tmp_path), workers=2, latency="none")
+    assert client.models.generate_content.call_count == 6
+
+    with patch("services.ai_service.get_client", side_effect=AssertionError("live call during replay")):
+        report = replay_ai_agents.run(CORPUS, mode="replay", fixture_dir=str(tmp_path), workers=2, latency="fixed:5")
+
+    assert report["missing_fixtures"] == 0
+    assert report["category_accuracy"] == 1.0
+    assert report["priority_accuracy"] == 0.5
+    assert report["calls_per_report"] == 3
+    assert report["prompt_tokens_per_report"] == 300
+    assert report["p50_report_ms"] >= 15
+
+def test_replay_reports_missing_fixtures(tmp_path):
+    report = replay_ai_agents.run(CORPUS[:1], mode="replay", fixture_dir=str(tmp_path), workers=1, latency="none")
+    assert report["missing_fixtures"] == 1
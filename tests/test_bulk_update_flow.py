@@ -0,0 +1,89 @@
+import os
+import pytest #type: ignore
+from unittest.mock import patch
+from app import app
+import io
+
+@pytest.fixture
+def client():
+    app.config["TESTING"] = True
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user"] = "admin"
+        sess["ctx"] = {"username": "admin", "role": "admin"}
+    return client
+
+@patch("services.report_service.publisher.publish")
+@patch("repository.incident_repo.IncidentRepository.bulk_update_status")
+def test_bulk_update_publishes_once(mock_bulk, mock_pub, client):
+    mock_bulk.return_value = {
+        "updated": ["a", "b"],
+        "conflicts": [{"id": "c", "version": 3}],
+        "missing": [],
+        "previous_status": {"a": "Pending", "b": "Pending"},
+    }
+
+    data = {"status": "In Progress", "incident_ids": ["a", "b", "c"], "version_c": "2"}
+    response = client.post("/admin/reports/bulk_update", data=data)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["updated"] == ["a", "b"]
+    assert body["conflicts"] == [{"id": "c", "version": 3}]
+    mock_bulk.assert_called_once_with(["a", "b", "c"], "In Progress", {}, {"c": 2})
+    assert mock_pub.call_count == 1
+
+@patch("repository.incident_repo.IncidentRepository.bulk_update_status")
+def test_bulk_resolve_requires_proof_for_every_incident(mock_bulk, client):
+    data = {
+        "status": "Resolved",
+        "incident_ids": ["a", "b"],
+        "proof_a": (io.BytesIO(b"fake image content"), "proof.jpg"),
+    }
+    response = client.post("/admin/reports/bulk_update", data=data, content_type="multipart/form-data")
+
+    assert response.status_code == 400
+    assert b"Proof image required" in response.data
+    mock_bulk.assert_not_called()
+
+@patch("repository.incident_repo.IncidentRepository.bulk_update_status")
+def test_bulk_update_rejects_malformed_versions(mock_bulk, client):
+    data = {"status": "In Progress", "incident_ids": ["a"], "version_a": "abc"}
+    response = client.post("/admin/reports/bulk_update", data=data)
+
+    assert response.status_code == 400
+    mock_bulk.assert_not_called()
+
+@patch("services.report_service.publisher.publish")
+@patch("repository.incident_repo.IncidentRepository.bulk_update_status")
+def test_bulk_resolve_saves_a_shared_proof_once(mock_bulk, mock_pub, client, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    mock_bulk.return_value = {"updated": ["a", "b"], "conflicts": [], "missing": [],
+                              "previous_status": {"a": "Pending", "b": "Pending"}}
+    proof = b"\xff\xd8\xff\xe0shared proof"
+    data = {"status": "Resolved", "incident_ids": ["a", "b"], "proof": (io.BytesIO(proof), "shared.jpg")}
+    response = client.post("/admin/reports/bulk_update", data=data, content_type="multipart/form-data")
+
+    assert response.status_code == 200
+    proof_urls = mock_bulk.call_args[0][2]
+    assert proof_urls["a"] == proof_urls["b"] and proof_urls["a"].endswith("-shared.jpg")
+    saved = os.listdir(tmp_path / "static/uploads/proofs")
+    assert len(saved) == 1 and (tmp_path / "static/uploads/proofs" / saved[0]).read_bytes() == proof
+
+@patch("services.report_service.publisher.publish")
+@patch("repository.incident_repo.IncidentRepository.bulk_update_status")
+def test_bulk_resolve_discards_proofs_of_rejected_incidents(mock_bulk, mock_pub, client, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    mock_bulk.return_value = {"updated": ["a"], "conflicts": [{"id": "b", "version": 4}], "missing": ["c"],
+                              "previous_status": {"a": "Pending"}}
+    jpeg = b"\xff\xd8\xff\xe0proof"
+    data = {"status": "Resolved", "incident_ids": ["a", "b", "c"], "version_b": "3",
+            "proof_a": (io.BytesIO(jpeg), "proof.jpg"),
+            "proof_b": (io.BytesIO(jpeg), "proof.jpg"),
+            "proof_c": (io.BytesIO(jpeg), "proof.jpg")}
+    response = client.post("/admin/reports/bulk_update", data=data, content_type="multipart/form-data")
+
+    assert response.status_code == 200
+    proof_urls = mock_bulk.call_args[0][2]
+    assert len(set(proof_urls.values())) == 3
+    assert os.listdir(tmp_path / "static/uploads/proofs") == [os.path.basename(proof_urls["a"])]
@@ -0,0 +1,80 @@
+from unittest.mock import MagicMock
+from services.dispatch_queue import DispatchQueue
+
+def make_queue(now):
+    return DispatchQueue(lease_seconds=60, clock=lambda: now[0])
+
+def test_orders_by_priority_then_age():
+    now = [10_000.0]
+    queue = make_queue(now)
+    queue.enqueue("low", "Low", timestamp=9_000)
+    queue.enqueue("high", "High", timestamp=9_500)
+    queue.enqueue("medium", "Medium", timestamp=9_000)
+    assert [queue.claim("a")["id"] for _ in range(3)] == ["high", "medium", "low"]
+    assert queue.claim("a") is None
+
+def test_old_low_items_age_past_new_high_items():
+    now = [100_000.0]
+    queue = make_queue(now)
+    queue.enqueue("old_low", "Low", timestamp=100_000 - 5 * 3600)
+    queue.enqueue("new_high", "High", timestamp=100_000)
+    assert queue.claim("a")["id"] == "old_low"
+
+def test_cluster_size_raises_rank():
+    now = [10_000.0]
+    queue = make_queue(now)
+    queue.enqueue("single", "Medium", timestamp=9_000)
+    for i in range(3):
+        queue.enqueue(f"cluster_{i}", "Medium", timestamp=9_100, cluster_id=7)
+    assert queue.claim("a")["id"].startswith("cluster_")
+
+def test_earlier_cluster_members_rise_as_the_cluster_grows():
+    now = [10_000.0]
+    queue = make_queue(now)
+    queue.enqueue("first", "Medium", timestamp=9_100, cluster_id=7)
+    queue.enqueue("single", "Medium", timestamp=9_000)
+    queue.enqueue("second", "Medium", timestamp=9_200, cluster_id=7)
+    queue.enqueue("third", "Medium", timestamp=9_300, cluster_id=7)
+    # every member now carries the three-incident bonus, so the oldest member leads
+    assert [item["id"] for item in queue.peek(4)] == ["first", "second", "third", "single"]
+    queue.complete("first")
+    queue.complete("second")
+    assert queue.peek(1)[0]["id"] == "single"
+
+def test_claim_is_exclusive_until_lease_expires():
+    now = [0.0]
+    queue = make_queue(now)
+    queue.enqueue("x", "High", timestamp=0)
+    assert queue.claim("alice")["id"] == "x"
+    assert queue.claim("bob") is None
+    assert not queue.complete("x", admin="bob")
+    now[0] = 61.0
+    assert queue.claim("bob")["id"] == "x"
+    assert queue.complete("x", admin="bob")
+    assert queue.stats() == {"queued": 0, "claimed": 0}
+
+def test_release_and_reenqueue():
+    now = [0.0]
+    queue = make_queue(now)
+    queue.enqueue("x", "Low", timestamp=0)
+    queue.enqueue("x", "High", timestamp=0)
+    assert len(queue) == 1
+    queue.claim("alice")
+    assert queue.release("x", admin="alice")
+    assert queue.peek(1)[0]["priority"] == "High"
+
+def test_load_restores_queue_and_claims():
+    now = [1_000.0]
+    queue = make_queue(now)
+    docs = []
+    for incident_id, data in [
+        ("a", {"priority": "High", "timestamp": 900, "claimed_by": "alice", "lease_expires_at": 1_500}),
+        ("b", {"priority": "Low", "timestamp": 900}),
+    ]:
+        doc = MagicMock()
+        doc.id = incident_id
+        doc.to_dict.return_value = data
+        docs.append(doc)
+    assert queue.load(docs) == 2
+    assert queue.stats() == {"queued": 1, "claimed": 1}
+    assert queue.claim("bob")["id"] == "b"
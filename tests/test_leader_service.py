@@ -0,0 +1,134 @@
+import threading
+from services.leader_service import LeaderElector, PeriodicJob
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeLeaseRepo:
+    """Same contract as LeaseRepository, kept in memory."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.leases = {}
+        self.lock = threading.Lock()
+        self.fail = False
+
+    def try_acquire(self, name, holder, ttl_seconds):
+        if self.fail:
+            raise ConnectionError("firestore unavailable")
+        with self.lock:
+            lease = self.leases.get(name)
+            if lease and lease["holder"] != holder and lease["expires_at"] > self.clock():
+                return None
+            self.leases[name] = {"holder": holder, "expires_at": self.clock() + ttl_seconds}
+            return self.leases[name]["expires_at"]
+
+    def release(self, name, holder):
+        with self.lock:
+            if self.leases.get(name, {}).get("holder") == holder:
+                del self.leases[name]
+                return True
+            return False
+
+
+def make_electors(n, clock, repo, events):
+    return [
+        LeaderElector("jobs", repo=repo, holder=f"w{i}", ttl_seconds=30, clock=clock,
+                      on_elected=lambda i=i: events.append(("elected", i)),
+                      on_demoted=lambda i=i: events.append(("demoted", i)))
+        for i in range(n)
+    ]
+
+
+def test_only_one_worker_leads():
+    clock = FakeClock()
+    repo = FakeLeaseRepo(clock)
+    events = []
+    electors = make_electors(4, clock, repo, events)
+    for _ in range(3):
+        for elector in electors:
+            elector.step()
+        clock.now += 10
+    assert [e.is_leader for e in electors] == [True, False, False, False]
+    assert events == [("elected", 0)]
+
+
+def test_follower_takes_over_after_lease_expires():
+    clock = FakeClock()
+    repo = FakeLeaseRepo(clock)
+    events = []
+    first, second = make_electors(2, clock, repo, events)
+    first.step()
+    second.step()
+    # the leader stops renewing, e.g. its process hangs
+    clock.now += 31
+    assert not first.is_leader
+    assert second.step()
+    assert first.step() is False
+    assert events == [("elected", 0), ("elected", 1), ("demoted", 0)]
+
+
+def test_leader_steps_down_when_renewal_keeps_failing():
+    clock = FakeClock()
+    repo = FakeLeaseRepo(clock)
+    events = []
+    elector, = make_electors(1, clock, repo, events)
+    elector.step()
+    repo.fail = True
+    clock.now += 10
+    assert elector.step()
+    clock.now += 25
+    assert not elector.step()
+    assert events == [("elected", 0), ("demoted", 0)]
+
+
+def test_stop_releases_lease_for_next_worker():
+    clock = FakeClock()
+    repo = FakeLeaseRepo(clock)
+    first, second = make_electors(2, clock, repo, [])
+    first.step()
+    first.stop()
+    assert second.step()
+
+
+def test_periodic_job_runs_only_on_leader():
+    clock = FakeClock()
+    repo = FakeLeaseRepo(clock)
+    leader, follower = make_electors(2, clock, repo, [])
+    leader.step()
+    follower.step()
+    jobs = [PeriodicJob("job", lambda: "ok", 0.01, e).start() for e in (leader, follower)]
+    threading.Event().wait(0.1)
+    for job in jobs:
+        job.stop()
+    assert jobs[0].runs > 0
+    assert jobs[1].runs == 0
+
+
+def test_app_takes_over_off_the_renewal_thread():
+    import app as server
+    from unittest.mock import patch
+    scan_started, finish_scan = threading.Event(), threading.Event()
+
+    def slow_scan():
+        scan_started.set()
+        finish_scan.wait(5)
+
+    with patch.object(server, "recover_dispatch_queue", side_effect=slow_scan), \
+         patch.object(server, "start_subscriber") as start_subscriber, \
+         patch.object(type(server.leader), "is_leader", new=True):
+        server.on_elected()
+        assert scan_started.wait(5)
+        start_subscriber.assert_not_called()
+        finish_scan.set()
+        for _ in range(50):
+            if start_subscriber.called:
+                break
+            threading.Event().wait(0.01)
+    start_subscriber.assert_called_once()
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+from services.lifecycle_service import ArchiveJob
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+def make_doc(incident_id, submitted_days_ago, resolved_days_ago=None):
+    doc = MagicMock()
+    doc.id = incident_id
+    data = {"status": "Resolved", "timestamp": NOW - timedelta(days=submitted_days_ago)}
+    if resolved_days_ago is not None:
+        data["resolved_at"] = NOW - timedelta(days=resolved_days_ago)
+    doc.to_dict.return_value = data
+    return doc
+
+def make_job(pages, checkpoint=None):
+    repo = MagicMock()
+    repo.get_archive_candidates.side_effect = pages
+    repo.archive.get_checkpoint.return_value = checkpoint or {}
+    repo.archive.archive.side_effect = lambda sink, records, collection: len(records)
+    return ArchiveJob(incident_repo=repo, sink=MagicMock(), retention_days=30, batch_size=2), repo
+
+def test_archives_only_incidents_resolved_before_cutoff():
+    job, repo = make_job([
+        [make_doc("old", 100, 90), make_doc("recently_resolved", 100, 5)],
+        [make_doc("legacy", 60)],
+    ])
+    result = job.run(max_batches=5, now=NOW)
+
+    assert result == {"archived": 2, "skipped": 1, "pass_complete": True}
+    archived_ids = [i for call in repo.archive.archive.call_args_list for i, _ in call.args[1]]
+    assert archived_ids == ["old", "legacy"]
+    assert repo.archive.save_checkpoint.call_args.args[1]["cursor_timestamp"] is None
+
+def test_resumes_from_checkpoint_and_stops_at_max_batches():
+    cursor = NOW - timedelta(days=200)
+    job, repo = make_job([[make_doc("a", 100, 90), make_doc("b", 99, 90)]], checkpoint={"cursor_timestamp": cursor})
+    result = job.run(max_batches=1, now=NOW)
+
+    assert result["pass_complete"] is False
+    assert repo.get_archive_candidates.call_args.kwargs["after_timestamp"] == cursor
+    saved = repo.archive.save_checkpoint.call_args.args[1]
+    assert saved["cursor_timestamp"] == NOW - timedelta(days=99)
@@ -0,0 +1,51 @@
+import threading
+import pytest #type: ignore
+from services.password_service import PasswordHasher, LoginThrottle, HasherBusyError
+
+@pytest.fixture
+def hasher():
+    return PasswordHasher(method="pbkdf2:sha256:1000", max_workers=2)
+
+def test_verify_and_rehash(hasher):
+    stored = hasher.hash("Secret#123")
+    assert hasher.verify(stored, "Secret#123")
+    assert not hasher.verify(stored, "wrong")
+    assert not hasher.needs_rehash(stored)
+    stronger = PasswordHasher(method="pbkdf2:sha256:2000", max_workers=1)
+    assert stronger.needs_rehash(stored)
+
+def test_shorthand_method_does_not_rehash_its_own_hashes():
+    for method in ("pbkdf2:sha256", "pbkdf2"):
+        hasher = PasswordHasher(method=method, max_workers=1)
+        assert not hasher.needs_rehash(hasher.hash("Secret#123"))
+
+def test_legacy_plaintext_needs_rehash(hasher):
+    assert hasher.verify("admin123", "admin123", allow_plaintext=True)
+    assert not hasher.verify("admin123", "admin124", allow_plaintext=True)
+    # an unrecognised stored value is never usable as a password for regular users
+    assert not hasher.verify("admin123", "admin123")
+    assert hasher.needs_rehash("admin123")
+
+def test_throttle_blocks_after_failures():
+    now = [0.0]
+    throttle = LoginThrottle(max_per_user=3, max_per_ip=5, window_seconds=60, clock=lambda: now[0])
+    for _ in range(3):
+        assert not throttle.is_blocked("alice", "1.2.3.4")
+        throttle.record_failure("alice", "1.2.3.4")
+    assert throttle.is_blocked("alice", "1.2.3.4")
+    throttle.record_failure("bob", "1.2.3.4")
+    throttle.record_failure("carol", "1.2.3.4")
+    assert throttle.is_blocked("dave", "1.2.3.4")
+    now[0] = 61.0
+    assert not throttle.is_blocked("alice", "1.2.3.4")
+
+def test_timed_out_hash_keeps_its_slot_until_it_finishes():
+    release = threading.Event()
+    hasher = PasswordHasher(method="pbkdf2:sha256:1000", max_workers=1, max_pending=1, wait_timeout=0.05)
+    with pytest.raises(HasherBusyError):
+        hasher._run(release.wait, 5)
+    # the first task is still running, so no new work is admitted
+    with pytest.raises(HasherBusyError):
+        hasher.hash("Secret#123")
+    release.set()
+    assert hasher.verify(hasher.hash("Secret#123"), "Secret#123")
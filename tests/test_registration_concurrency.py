@@ -0,0 +1,54 @@
+import os
+import uuid
+import pytest #type: ignore
+from concurrent.futures import ThreadPoolExecutor
+
+# Needs a Firestore emulator: gcloud emulators firestore start, then export FIRESTORE_EMULATOR_HOST
+pytestmark = pytest.mark.skipif(not os.getenv("FIRESTORE_EMULATOR_HOST"), reason="Firestore emulator not configured")
+
+SIGNUPS = 16
+
+def signup(username, email):
+    from services.user_service import UserService
+    service = UserService()
+    return service.register_user({
+        "name": "Test User",
+        "username": username,
+        "email": email,
+        "phone": "9876543210",
+        "password": "Secret#123",
+    })
+
+def run_parallel(pairs):
+    with ThreadPoolExecutor(max_workers=SIGNUPS) as pool:
+        return list(pool.map(lambda p: signup(*p), pairs))
+
+def test_parallel_signups_same_username():
+    username = f"race_{uuid.uuid4().hex[:8]}"
+    results = run_parallel([(username, f"{username}_{i}@example.com") for i in range(SIGNUPS)])
+    assert sum(1 for errors in results if not errors) == 1
+    assert all(errors.get("userError") for errors in results if errors)
+
+def test_parallel_signups_same_email():
+    email = f"race_{uuid.uuid4().hex[:8]}@example.com"
+    results = run_parallel([(f"user_{uuid.uuid4().hex[:8]}", email) for _ in range(SIGNUPS)])
+    assert sum(1 for errors in results if not errors) == 1
+    assert all(errors.get("mailError") for errors in results if errors)
+
+def test_legacy_user_email_is_not_reusable():
+    from repository.user_repository import UserRepository
+    repo = UserRepository()
+    legacy = f"legacy_{uuid.uuid4().hex[:8]}"
+    email = f"{legacy}@example.com"
+    # written directly, as users were before email reservations
+    repo.collection.document(legacy).set({"username": legacy, "email": email})
+
+    assert signup(f"new_{legacy}", email) == {"mailError": True}
+
+    other = f"other_{legacy}"
+    assert not signup(other, f"{other}@example.com")
+    assert repo.update_user(other, {"email": email}) == {"mailError": True}
+    # the legacy user keeps its own email and is given the reservation
+    assert repo.update_user(legacy, {"email": email, "name": "Legacy"}) is True
+    assert repo.get_email_owner(email) == legacy
+    assert email not in [c["email"] for c in repo.backfill_email_reservations()["conflicts"]]
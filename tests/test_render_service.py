@@ -0,0 +1,61 @@
+from flask import Flask
+from services import render_service
+from services.render_service import FragmentCache
+
+ENDPOINTS = ["admin_dashboard", "admin_reports", "admin_users", "logout", "bulk_update_report_status"]
+
+
+def make_app():
+    app = Flask(__name__, template_folder=render_service.TEMPLATE_DIR, static_folder=None)
+    app.secret_key = "bench"
+    for endpoint in ENDPOINTS:
+        app.add_url_rule(f"/{endpoint}", endpoint, lambda: "")
+    app.add_url_rule("/admin/reports/<incident_id>", "admin_report_detail", lambda incident_id: "")
+    app.add_url_rule("/static/<path:filename>", "static", lambda filename: "")
+    return app
+
+
+def make_reports(n):
+    return [{
+        "id": f"incident{i:06d}",
+        "type": "Traffic",
+        "category": "Traffic",
+        "summary": f"Congestion near junction {i} due to signal failure.",
+        "location": f"Road {i % 97}",
+        "priority": ("Low", "Medium", "High")[i % 3],
+        "status": ("Pending", "In Progress", "Resolved")[i % 3],
+        "media_url": None,
+        "timestamp": "2025-11-07 12:00:00",
+        "user_email": f"user{i % 50}",
+        "version": 0,
+    } for i in range(n)]
+
+
+def test_fragment_cache_reuses_rows_until_they_change():
+    app = make_app()
+    cache = FragmentCache(max_entries=10)
+    reports = make_reports(3)
+    with app.test_request_context("/admin/reports"):
+        first = [html for _, html in cache.render_rows("partials/admin_report_row.html", reports)]
+        assert cache.misses == 3
+        list(cache.render_rows("partials/admin_report_row.html", reports))
+        assert cache.hits == 3
+        reports[0]["status"] = "Resolved"
+        changed = [html for _, html in cache.render_rows("partials/admin_report_row.html", reports)]
+    assert cache.misses == 4
+    assert "Resolved" in changed[0] and changed[1] == first[1]
+
+def test_invalidate_drops_incident_fragments():
+    app = make_app()
+    cache = FragmentCache()
+    with app.test_request_context("/admin/reports"):
+        list(cache.render_rows("partials/admin_report_row.html", make_reports(2)))
+    cache.invalidate("incident000000")
+    assert len(cache._entries) == 1
+
+def test_page_etag_returns_304():
+    from services.render_service import render_with_etag
+    app = make_app()
+    with app.test_request_context("/admin/users", headers={"If-None-Match": '"abc"'}):
+        response = render_with_etag("admin_users.html", "abc", users=[], rows=[])
+    assert response.status_code == 304
@@ -0,0 +1,50 @@
+import gzip
+import json
+import pytest #type: ignore
+from unittest.mock import patch, MagicMock
+from app import app
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as client:
+        yield client
+
+def make_docs(n):
+    docs = []
+    for i in range(n):
+        doc = MagicMock()
+        doc.id = f"incident_{i}"
+        doc.to_dict.return_value = {
+            "type": "Traffic",
+            "summary": "Congestion near the bus stand " * 3,
+            "status": "Pending",
+            "timestamp": "2025-11-07T12:00:00",
+        }
+        docs.append(doc)
+    return docs
+
+@patch("repository.incident_repo.IncidentRepository.get_all_reports")
+def test_all_reports_projects_requested_fields(mock_get_reports, client):
+    mock_get_reports.return_value = make_docs(2)
+    with client.session_transaction() as sess:
+        sess["user"] = "testuser"
+
+    response = client.get("/user/all_reports?fields=id,type,status,bogus")
+
+    assert response.status_code == 200
+    mock_get_reports.assert_called_once_with(fields=["type", "status"])
+    reports = response.get_json()["reports"]
+    assert reports[0] == {"id": "incident_0", "type": "Traffic", "status": "Pending"}
+
+@patch("repository.incident_repo.IncidentRepository.get_all_reports")
+def test_all_reports_gzip(mock_get_reports, client):
+    mock_get_reports.return_value = make_docs(50)
+    with client.session_transaction() as sess:
+        sess["user"] = "testuser"
+
+    response = client.get("/user/all_reports", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    data = json.loads(gzip.decompress(response.data))
+    assert len(data["reports"]) == 50
@@ -0,0 +1,48 @@
+import pytest #type: ignore
+from datetime import datetime
+from services.search_service import IncidentSearchIndex, build_match
+
+@pytest.fixture
+def index(tmp_path):
+    index = IncidentSearchIndex(str(tmp_path / "search.sqlite3"))
+    index.upsert_many([
+        ("a", {"description": "Bus collided with a car near the flyover", "summary": "Bus accident at flyover",
+               "location": "Tambaram", "type": "Accident", "status": "Pending", "priority": "High",
+               "timestamp": datetime(2025, 11, 1)}),
+        ("b", {"description": "Garbage overflowing near the park", "summary": "Garbage overflow",
+               "location": "Central Park", "type": "Other", "status": "Resolved", "priority": "Low",
+               "timestamp": datetime(2025, 11, 5)}),
+        ("c", {"description": "Car parked on the footpath near the bus stand", "summary": "Illegal parking",
+               "location": "Tambaram", "type": "Traffic", "status": "Pending", "priority": "Medium",
+               "timestamp": datetime(2025, 11, 7)}),
+    ])
+    yield index
+    index.close()
+
+def ids(result):
+    return [r["id"] for r in result["results"]]
+
+def test_build_match_escapes_user_input():
+    assert build_match('bus "flyover accident" garb* summary:park') == \
+        '"bus" AND "flyover accident" AND "garb"* AND summary : "park"'
+    assert build_match('AND OR ) (') == '"AND" AND "OR"'
+
+def test_prefix_phrase_and_column_queries(index):
+    assert set(ids(index.search("bus"))) == {"a", "c"}
+    assert ids(index.search("garb*")) == ["b"]
+    assert ids(index.search('"bus stand"')) == ["c"]
+    assert ids(index.search("summary:bus")) == ["a"]
+
+def test_field_and_date_filters(index):
+    assert ids(index.search("tambaram", filters={"type": "Traffic"})) == ["c"]
+    assert ids(index.search("", filters={"status": "Pending"})) == ["c", "a"]
+    assert ids(index.search("", date_from=datetime(2025, 11, 4), date_to=datetime(2025, 11, 6))) == ["b"]
+
+def test_incremental_updates_and_paging(index):
+    index.update_fields("a", status="Resolved")
+    assert set(ids(index.search("", filters={"status": "Resolved"}))) == {"a", "b"}
+    index.upsert("a", {"description": "Fire in a warehouse", "status": "Pending", "priority": "High"})
+    assert ids(index.search("fire")) == ["a"]
+    assert "a" not in ids(index.search("flyover"))
+    page = index.search("", per_page=2, page=2)
+    assert page["total"] == 3 and len(page["results"]) == 1
@@ -0,0 +1,107 @@
+import pytest #type: ignore
+from datetime import timedelta
+from flask import Flask, session
+from services.session_service import MemorySessionStore, ServerSideSessionInterface
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.secret_key = "testkey"
+    store = MemorySessionStore()
+    app.session_interface = ServerSideSessionInterface(store, idle_timeout=timedelta(minutes=5))
+
+    @app.route("/login/<username>")
+    def login(username):
+        app.session_interface.regenerate(session)
+        session["user"] = username
+        session["ctx"] = {"username": username, "role": "user", "name": username.title()}
+        return "ok"
+
+    @app.route("/whoami")
+    def whoami():
+        return session.get("ctx", {}).get("name", "anonymous")
+
+    @app.route("/logout")
+    def logout():
+        session.clear()
+        return "bye"
+
+    return app
+
+def test_cookie_carries_only_session_id(app):
+    client = app.test_client()
+    client.get("/login/alice")
+    cookie = client.get_cookie("session")
+    assert "Alice" not in cookie.value
+    assert client.get("/whoami").data == b"Alice"
+
+def test_logout_removes_server_side_state(app):
+    client = app.test_client()
+    client.get("/login/alice")
+    cookie = client.get_cookie("session").value
+    client.get("/logout")
+    client.set_cookie("session", cookie)
+    assert client.get("/whoami").data == b"anonymous"
+
+def test_revoke_user_ends_all_sessions(app):
+    first, second = app.test_client(), app.test_client()
+    first.get("/login/alice")
+    second.get("/login/alice")
+    app.session_interface.store.revoke_user("alice")
+    assert first.get("/whoami").data == b"anonymous"
+    assert second.get("/whoami").data == b"anonymous"
+
+def test_idle_expiry():
+    now = [0.0]
+    store = MemorySessionStore(clock=lambda: now[0])
+    store.set("sid", {"user": "alice"}, ttl=60, username="alice")
+    now[0] = 59
+    assert store.get("sid") == {"user": "alice"}
+    now[0] = 61
+    assert store.get("sid") is None
+
+def test_unexpected_user_shapes_are_not_indexed(app):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user"] = {"username": "alice"}
+    assert client.get("/whoami").data == b"anonymous"
+    assert app.session_interface.store._by_user == {}
+
+class FakeRedis:
+    def __init__(self):
+        self.ttls = {}
+
+    def pipeline(self):
+        return self
+
+    def setex(self, key, ttl, value):
+        self.ttls[key] = ttl
+
+    def sadd(self, key, *members):
+        pass
+
+    def expire(self, key, ttl, nx=False, gt=False):
+        current = self.ttls.get(key)
+        if (nx and current is None) or (gt and current is not None and ttl > current):
+            self.ttls[key] = ttl
+
+    def execute(self):
+        pass
+
+def test_redis_user_index_ttl_is_never_shortened():
+    from services.session_service import RedisSessionStore
+    client = FakeRedis()
+    store = RedisSessionStore(client)
+    store.set("long", {}, ttl=30 * 86400, username="alice")
+    store.set("short", {}, ttl=1800, username="alice")
+    assert client.ttls["session:user:alice"] == 30 * 86400
+
+
+def test_memory_store_refused_with_message_queue(monkeypatch):
+    from services.session_service import create_session_interface
+    monkeypatch.delenv("SESSION_BACKEND", raising=False)
+    monkeypatch.setenv("SOCKETIO_MESSAGE_QUEUE", "redis://localhost:6379/0")
+    with pytest.raises(RuntimeError):
+        create_session_interface()
+    monkeypatch.delenv("SOCKETIO_MESSAGE_QUEUE")
+    assert isinstance(create_session_interface().store, MemorySessionStore)
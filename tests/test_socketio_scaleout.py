@@ -0,0 +1,223 @@
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+import pytest #type: ignore
+
+# Needs a Redis-compatible server and the Firestore emulator:
+#   redis-server &   export SOCKETIO_TEST_MESSAGE_QUEUE=redis://localhost:6379/0
+#   gcloud emulators firestore start &   export FIRESTORE_EMULATOR_HOST=...
+MESSAGE_QUEUE = os.getenv("SOCKETIO_TEST_MESSAGE_QUEUE")
+pytestmark = pytest.mark.skipif(not MESSAGE_QUEUE or not os.getenv("FIRESTORE_EMULATOR_HOST"),
+                                reason="Socket.IO message queue or Firestore emulator not configured")
+
+WORKERS = 3
+CLIENTS_PER_WORKER = 2
+EVENTS = 10
+
+
+class RedisLeaseRepo:
+    """LeaseRepository contract on Redis, so worker processes can elect a leader without Firestore leases."""
+
+    def __init__(self, client, prefix):
+        self.client = client
+        self.prefix = prefix
+
+    def try_acquire(self, name, holder, ttl_seconds):
+        key = f"{self.prefix}lease:{name}"
+        if self.client.set(key, holder, nx=True, ex=ttl_seconds) or self.client.get(key) == holder.encode():
+            self.client.expire(key, ttl_seconds)
+            return time.time() + ttl_seconds
+        return None
+
+    def release(self, name, holder):
+        key = f"{self.prefix}lease:{name}"
+        if self.client.get(key) == holder.encode():
+            self.client.delete(key)
+
+
+class FakeMessage:
+    def __init__(self, data):
+        self.data = data
+
+    def ack(self):
+        pass
+
+
+class FakeStreamingPull:
+    def __init__(self):
+        self.cancelled = threading.Event()
+
+    def result(self):
+        self.cancelled.wait()
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+class RedisSubscriber:
+    """Stands in for the Pub/Sub subscriber: each event is popped from a Redis list by whichever worker is subscribed."""
+
+    def __init__(self, client, prefix):
+        self.client = client
+        self.key = f"{prefix}events"
+
+    def subscription_path(self, project, subscription):
+        return f"projects/{project}/subscriptions/{subscription}"
+
+    def subscribe(self, path, callback):
+        future = FakeStreamingPull()
+
+        def pull():
+            while not future.cancelled.is_set():
+                item = self.client.blpop(self.key, timeout=1)
+                if item:
+                    callback(FakeMessage(item[1]))
+
+        threading.Thread(target=pull, daemon=True).start()
+        return future
+
+
+def run_worker(port, message_queue, prefix, index_path):
+    from unittest.mock import patch, MagicMock
+    import redis
+    os.environ.update({
+        "BACKGROUND_JOBS": "1",
+        "SOCKETIO_MESSAGE_QUEUE": message_queue,
+        "SESSION_BACKEND": "redis",
+        "REDIS_URL": message_queue,
+        "SOCKETIO_ASYNC_MODE": "threading",
+        "LEADER_LEASE_SECONDS": "3",
+        "SEARCH_INDEX_PATH": index_path,
+    })
+    client = redis.Redis.from_url(message_queue)
+    with patch("repository.lease_repository.LeaseRepository", lambda: RedisLeaseRepo(client, prefix)), \
+         patch("google.cloud.pubsub_v1.SubscriberClient", lambda: RedisSubscriber(client, prefix)), \
+         patch("google.cloud.pubsub_v1.PublisherClient", MagicMock):
+        import app as server
+
+    emit = server.socketio.emit
+
+    def counted_emit(event, data=None, **kwargs):
+        client.incr(f"{prefix}emits:{port}")
+        return emit(event, data, **kwargs)
+
+    server.socketio.emit = counted_emit
+    server.socketio.run(server.app, host="127.0.0.1", port=port, allow_unsafe_werkzeug=True)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until(condition, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def port_open(port):
+    with socket.socket() as s:
+        return s.connect_ex(("127.0.0.1", port)) == 0
+
+
+@pytest.fixture
+def redis_client():
+    import redis
+    return redis.Redis.from_url(MESSAGE_QUEUE)
+
+
+@pytest.fixture
+def workers(tmp_path, redis_client):
+    ctx = multiprocessing.get_context("spawn")
+    prefix = f"scaleout:{uuid.uuid4().hex[:8]}:"
+    ports = [free_port() for _ in range(WORKERS)]
+    processes = {
+        port: ctx.Process(target=run_worker, args=(port, MESSAGE_QUEUE, prefix, str(tmp_path / f"search{port}.sqlite3")), daemon=True)
+        for port in ports
+    }
+    for process in processes.values():
+        process.start()
+    for port in ports:
+        assert wait_until(lambda: port_open(port)), f"worker on port {port} did not start"
+    yield processes, prefix
+    for process in processes.values():
+        process.terminate()
+        process.join(5)
+    keys = redis_client.keys(f"{prefix}*")
+    if keys:
+        redis_client.delete(*keys)
+
+
+def connect_clients(ports):
+    import socketio
+    clients = {}
+    for port in ports:
+        for _ in range(CLIENTS_PER_WORKER):
+            client = socketio.Client()
+            client.received = Counter()
+            lock = threading.Lock()
+
+            def on_event(data, client=client, lock=lock):
+                with lock:
+                    client.received[data["incident_id"]] += 1
+
+            client.on("new_incident", on_event)
+            client.connect(f"http://127.0.0.1:{port}", transports=["polling"])
+            clients.setdefault(port, []).append(client)
+    return clients
+
+
+def publish(redis_client, prefix, ids):
+    for incident_id in ids:
+        redis_client.rpush(f"{prefix}events", json.dumps({"event": "new_incident", "incident_id": incident_id, "priority": "Low"}))
+
+
+def emit_counts(redis_client, prefix, ports):
+    return {port: int(redis_client.get(f"{prefix}emits:{port}") or 0) for port in ports}
+
+
+def test_only_the_leader_emits_and_each_client_gets_each_event_once(workers, redis_client):
+    processes, prefix = workers
+    ports = list(processes)
+    clients = connect_clients(ports)
+    first_batch = [f"inc{i}" for i in range(EVENTS)]
+    second_batch = [f"inc{i}" for i in range(EVENTS, 2 * EVENTS)]
+    try:
+        publish(redis_client, prefix, first_batch)
+        everyone = [c for group in clients.values() for c in group]
+        assert wait_until(lambda: all(sum(c.received.values()) >= EVENTS for c in everyone))
+        time.sleep(0.5)  # let any duplicate arrive before checking
+        for client in everyone:
+            assert client.received == Counter(first_batch)
+        emits = emit_counts(redis_client, prefix, ports)
+        leaders = [port for port, count in emits.items() if count]
+        assert len(leaders) == 1 and emits[leaders[0]] == EVENTS
+
+        # the leader dies; another worker takes the lease once it expires and consumes the rest
+        processes[leaders[0]].terminate()
+        processes[leaders[0]].join(5)
+        survivors = [c for port, group in clients.items() if port != leaders[0] for c in group]
+        publish(redis_client, prefix, second_batch)
+        assert wait_until(lambda: all(sum(c.received.values()) >= 2 * EVENTS for c in survivors), timeout=30)
+        time.sleep(0.5)
+        for client in survivors:
+            assert client.received == Counter(first_batch + second_batch)
+        emits = emit_counts(redis_client, prefix, [port for port in ports if port != leaders[0]])
+        assert sorted(emits.values()) == [0, EVENTS]
+    finally:
+        for group in clients.values():
+            for client in group:
+                try:
+                    client.disconnect()
+                except Exception:
+                    pass
@@ -14,10 +14,11 @@ def test_update_report_status(mock_update, client):
 
     with client.session_transaction() as sess:
         sess["user"] = {"username": "admin"}
+        sess["ctx"] = {"username": "admin", "role": "admin"}
 
     data = {
         "status": "Resolved",
-        "proof": (io.BytesIO(b"fake image content"), "proof.jpg")
+        "proof": (io.BytesIO(b"\xff\xd8\xff\xe0fake image content"), "proof.jpg")
     }
 
     response = client.post(
@@ -34,6 +35,7 @@ def test_update_report_status(mock_update, client):
 def test_update_report_status_without_proof(mock_update, client):
     with client.session_transaction() as sess:
         sess["user"] = {"username": "admin"}
+        sess["ctx"] = {"username": "admin", "role": "admin"}
 
     data = {"status": "Resolved"}  
 
@@ -0,0 +1,107 @@
+import io
+import os
+import threading
+import pytest #type: ignore
+from flask import Flask, jsonify
+from werkzeug.datastructures import FileStorage
+from services.upload_service import UploadAdmission, UploadRejected, save_upload, sniff_type, IMAGE_TYPES, MEDIA_TYPES
+
+JPEG = b"\xff\xd8\xff\xe0\x00\x10JFIF" + b"\x00" * 64
+MP4 = b"\x00\x00\x00\x18ftypmp42" + b"\x00" * 64
+
+
+def make_app(admission, limit=1024, started=None, finish=None):
+    app = Flask(__name__)
+    app.secret_key = "test"
+    calls = []
+
+    @app.route("/upload", methods=["POST"])
+    @admission.guard(limit)
+    def upload():
+        calls.append(True)
+        if started is not None:
+            started.set()
+            finish.wait(5)
+        return jsonify({"status": "success"})
+
+    app.calls = calls
+    return app
+
+
+def test_sniff_type_reads_magic_bytes_and_rewinds():
+    stream = io.BytesIO(MP4)
+    assert sniff_type(stream) == "video/mp4"
+    assert stream.tell() == 0
+    assert sniff_type(io.BytesIO(JPEG)) == "image/jpeg"
+    assert sniff_type(io.BytesIO(b"#!/bin/sh\nrm -rf /")) is None
+
+
+def test_save_upload_rejects_disguised_files(tmp_path):
+    app = Flask(__name__)
+    with app.test_request_context():
+        file = FileStorage(io.BytesIO(b"<html>not an image</html>"), filename="proof.jpg")
+        try:
+            save_upload(file, str(tmp_path), IMAGE_TYPES, "proofs")
+            assert False, "expected UploadRejected"
+        except UploadRejected as e:
+            assert e.status_code == 415
+        assert os.listdir(tmp_path) == []
+
+        video = FileStorage(io.BytesIO(MP4), filename="../clip.mp4")
+        url = save_upload(video, str(tmp_path), MEDIA_TYPES, "uploads")
+    assert url == "/static/uploads/clip.mp4"
+    assert os.listdir(tmp_path) == ["clip.mp4"]
+    assert (tmp_path / "clip.mp4").read_bytes() == MP4
+    umask = os.umask(0o022)
+    os.umask(umask)
+    assert (tmp_path / "clip.mp4").stat().st_mode & 0o777 == 0o666 & ~umask
+
+
+def test_oversized_upload_rejected_before_the_view_runs():
+    admission = UploadAdmission(max_global=2, max_per_user=1)
+    app = make_app(admission, limit=100)
+    response = app.test_client().post("/upload", data={"media": (io.BytesIO(JPEG * 4), "a.jpg")})
+    assert response.status_code == 413
+    assert app.calls == []
+    assert admission.snapshot()["rejected_size"] == 1
+
+
+def test_concurrent_uploads_capped_per_user_and_globally():
+    admission = UploadAdmission(max_global=1, max_per_user=1, queue_timeout=0.05)
+    with admission.admit("alice"):
+        assert admission.snapshot()["active"] == 1
+        with pytest.raises(UploadRejected) as e:
+            with admission.admit("alice"):
+                pass
+        assert e.value.status_code == 429
+        with pytest.raises(UploadRejected) as e:
+            with admission.admit("bob"):
+                pass
+        assert e.value.status_code == 503
+    with admission.admit("bob"):
+        pass
+    stats = admission.snapshot()
+    assert stats["active"] == 0 and stats["users_uploading"] == 0
+    assert stats["rejected_user_limit"] == 1 and stats["rejected_busy"] == 1 and stats["admitted"] == 2
+
+
+def test_slow_view_does_not_hold_an_upload_slot():
+    admission = UploadAdmission(max_global=1, max_per_user=1, queue_timeout=0.05)
+    started, finish = threading.Event(), threading.Event()
+    app = make_app(admission, started=started, finish=finish)
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user"] = "alice"
+    upload = {"media": (io.BytesIO(JPEG), "a.jpg")}
+
+    # the view stands in for the AI classification that follows the save
+    first = threading.Thread(target=client.post, args=("/upload",), kwargs={"data": upload})
+    first.start()
+    assert started.wait(5)
+    assert admission.snapshot()["active"] == 0
+    with admission.admit("bob"):
+        pass
+
+    finish.set()
+    first.join(5)
+    assert admission.snapshot()["admitted"] == 2
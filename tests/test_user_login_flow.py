@@ -41,3 +41,62 @@ def test_login_failure(mock_auth, client):
 
     assert response.status_code == 200
     assert b"Invalid credentials" in response.data
+
+@patch("repository.user_repository.UserRepository.get_user_by_username")
+def test_change_password_is_throttled(mock_get_user, client):
+    from services.password_service import PasswordHasher
+    mock_get_user.return_value = {"username": "throttled", "password": PasswordHasher(method="pbkdf2:sha256:1000").hash("Secret#123")}
+    with client.session_transaction() as sess:
+        sess["user"] = "throttled"
+    data = {"current_password": "Wrong#123", "new_password": "Newpass#123", "confirm_password": "Newpass#123"}
+
+    codes = [client.post("/change_password", json=data).status_code for _ in range(6)]
+
+    assert codes == [400] * 5 + [429]
+
+@patch("services.user_service.UserService.register_user")
+@patch("services.user_service.UserService.validate_registration", return_value={})
+def test_register_reports_busy_hasher(mock_validate, mock_register, client):
+    from services.password_service import HasherBusyError
+    mock_register.side_effect = HasherBusyError("Password hashing pool is saturated")
+    data = {"name": "Bob", "username": "bob", "mail": "bob@example.com", "phone": "5551234567",
+            "password": "Secret#123", "confirm_password": "Secret#123"}
+
+    response = client.post("/register", data=data)
+
+    assert response.status_code == 503
+    assert b"Server is busy" in response.data
+
+@patch("repository.user_repository.UserRepository.update_user")
+@patch("repository.user_repository.UserRepository.get_user_by_username")
+def test_change_password_verifies_current_password_once(mock_get_user, mock_update, client):
+    from services.password_service import PasswordHasher
+    mock_get_user.return_value = {"username": "bob", "password": PasswordHasher(method="pbkdf2:sha256:1000").hash("Secret#123")}
+    with client.session_transaction() as sess:
+        sess["user"] = "bob"
+    data = {"current_password": "Secret#123", "new_password": "Newpass#123", "confirm_password": "Newpass#123"}
+
+    with patch("services.password_service.PasswordHasher.verify", wraps=PasswordHasher.verify, autospec=True) as verify:
+        response = client.post("/change_password", json=data)
+
+    assert response.status_code == 200
+    assert verify.call_count == 1
+    assert mock_update.call_args[0][0] == "bob"
+
+def test_user_session_cannot_reach_admin_routes(client):
+    with client.session_transaction() as sess:
+        sess["user"] = "alice"
+        sess["ctx"] = {"username": "alice", "role": "user"}
+
+    assert client.get("/admin/reports").status_code == 302
+    assert client.post("/admin/reports/bulk_update", data={"status": "Resolved", "incident_ids": ["a"]}).status_code == 403
+    assert client.post("/admin/dispatch/claim").status_code == 403
+
+def test_admin_session_cannot_act_as_user(client):
+    with client.session_transaction() as sess:
+        sess["user"] = "alice"
+        sess["ctx"] = {"username": "alice", "role": "admin"}
+
+    assert client.get("/user/reports").status_code == 403
+    assert client.post("/submit", data={"description": "x"}).status_code == 403
+    assert client.post("/change_password", json={}).status_code == 403